@@ -0,0 +1,85 @@
+"""
+On-disk cache of parsed inputs.
+
+Entries are keyed by the hash of the input file and the name/version of
+the parser, so changing either the input or the parser invalidates the
+entry. Numpy arrays are stored as .npy, anything else is pickled. For
+tuples the array members go to separate .npy files and the rest is
+pickled with a reference in their place.
+"""
+import hashlib
+import os
+import pickle
+
+import numpy as np
+
+from helpers.inputs import AocData
+
+
+def file_hash(f_in, blocksize=1 << 20):
+    h = hashlib.sha256()
+    with open(f_in, 'rb') as f:
+        while block := f.read(blocksize):
+            h.update(block)
+    return h.hexdigest()
+
+
+class ArrayRef():
+    """ placeholder for the array member i of a cached tuple """
+
+    def __init__(self, i):
+        self.i = i
+
+
+class ParseCache():
+
+    def __init__(self, cache_dir='.aoc_cache'):
+        self.cache_dir = cache_dir
+
+    def path(self, f_in, name, version):
+        """ returns the path of the entry without extension """
+        return os.path.join(self.cache_dir, f"{name}-v{version}-{file_hash(f_in)}")
+
+    def load(self, f_in, parser, name, version=1):
+        """
+        returns parser(AocData.from_file(f_in)), either from the cache
+        or by parsing the file and storing the result
+        """
+        path = self.path(f_in, name, version)
+        if os.path.exists(path + '.npy'):
+            return np.load(path + '.npy')
+        if os.path.exists(path + '.pkl'):
+            with open(path + '.pkl', 'rb') as f:
+                parsed = pickle.load(f)
+            if isinstance(parsed, tuple):
+                parsed = tuple(np.load(f"{path}-{x.i}.npy") if isinstance(x, ArrayRef) else x for x in parsed)
+            return parsed
+
+        parsed = parser(AocData.from_file(f_in))
+        self.store(path, parsed)
+        return parsed
+
+    def store(self, path, parsed):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        if isinstance(parsed, np.ndarray):
+            self.write(path + '.npy', lambda f: np.save(f, parsed, allow_pickle=False))
+            return
+
+        if isinstance(parsed, tuple):
+            # the arrays are written first, the .pkl marks a complete entry
+            members = []
+            for i, x in enumerate(parsed):
+                if isinstance(x, np.ndarray):
+                    self.write(f"{path}-{i}.npy", lambda f: np.save(f, x, allow_pickle=False))
+                    x = ArrayRef(i)
+                members.append(x)
+            parsed = tuple(members)
+
+        self.write(path + '.pkl', lambda f: pickle.dump(parsed, f, protocol=pickle.HIGHEST_PROTOCOL))
+
+    def write(self, f_out, write):
+        # write to a temporary file first, concurrent runs never see partial entries
+        tmp = f"{f_out}.{os.getpid()}.tmp"
+        with open(tmp, 'wb') as f:
+            write(f)
+        os.replace(tmp, f_out)
@@ -0,0 +1,299 @@
+"""
+Deterministic generators of valid puzzle inputs of arbitrary size.
+
+Every generator takes a size n and a seed and returns the input as a
+string (same format as data/NN), i.e. AocData.from_str(day08(1000)) is
+a valid input of Day08. n is the number of lines/records for list like
+formats and the edge length for grids.
+
+usage: python -m helpers.generators DAY N [--seed S] [-o FILE]
+"""
+import argparse
+import random
+
+letters = 'ABCDEFGHIJKLMNOPQRSTUVWXYZ'
+
+
+def _split(total, parts, rng):
+    """ splits total randomly into parts non-negative ints """
+    cuts = sorted(rng.randint(0, total) for _ in range(parts-1))
+    return [b-a for a,b in zip([0]+cuts, cuts+[total])]
+
+
+def day04(n, seed=0, max_section=99):
+    """ n section assignment pairs """
+    rng = random.Random(seed)
+    lines = []
+    for i in range(n):
+        a, b = sorted(rng.randint(1, max_section) for _ in range(2))
+        c, d = sorted(rng.randint(1, max_section) for _ in range(2))
+        lines.append(f"{a}-{b},{c}-{d}")
+    return '\n'.join(lines)
+
+
+def day05(n, seed=0, n_stacks=9, height=None):
+    """ n moves on n_stacks (at most 9) stacks, no stack is ever emptied """
+    assert 2 <= n_stacks <= 9
+    rng = random.Random(seed)
+    height = n // n_stacks + 2 if height is None else height
+    heights = [height] * n_stacks
+
+    lines = [' '.join(f"[{rng.choice(letters)}]" for h in heights) for level in range(height)]
+    lines.append(' '.join(f" {i+1} " for i in range(n_stacks)))
+    lines.append('')
+    for i in range(n):
+        src = rng.choice([s for s in range(n_stacks) if heights[s] > 1])
+        dst = rng.choice([s for s in range(n_stacks) if s != src])
+        cnt = rng.randint(1, heights[src]-1)
+        heights[src] -= cnt
+        heights[dst] += cnt
+        lines.append(f"move {cnt} from {src+1} to {dst+1}")
+    return '\n'.join(lines)
+
+
+def day06(n, seed=0):
+    """ datastream of n characters without any marker, followed by the
+        first markers of size 4 and 14
+    """
+    rng = random.Random(seed)
+    return ''.join(rng.choice('abc') for _ in range(n)) + 'defghijklmnopq'
+
+
+def day07(n, seed=0):
+    """ terminal log of a random tree with n directories """
+    rng = random.Random(seed)
+    lines = ['$ cd /']
+    todo = [(None, n-1)] # (name, number of directories below)
+    while todo:
+        item = todo.pop()
+        if item == '..':
+            lines.append('$ cd ..')
+            continue
+        name, below = item
+        if name is not None:
+            lines.append(f"$ cd {name}")
+        n_sub = min(below, rng.randint(1, 3))
+        lines.append('$ ls')
+        lines += [f"dir d{i}" for i in range(n_sub)]
+        lines += [f"{rng.randint(1, 300000)} f{i}.txt" for i in range(rng.randint(1, 3))]
+        shares = _split(below-n_sub, n_sub, rng) if n_sub else []
+        for i in reversed(range(n_sub)):
+            todo += ['..', (f"d{i}", shares[i])]
+    return '\n'.join(lines)
+
+
+def day08(n, seed=0):
+    """ n x n grid of tree heights """
+    rng = random.Random(seed)
+    return '\n'.join(''.join(rng.choices('0123456789', k=n)) for i in range(n))
+
+
+def day09(n, seed=0, max_count=20):
+    """ n rope moves """
+    rng = random.Random(seed)
+    return '\n'.join(f"{rng.choice('UDLR')} {rng.randint(1, max_count)}" for i in range(n))
+
+
+def day10(n, seed=0):
+    """ program of n instructions (n >= 240 to fill the screen) """
+    rng = random.Random(seed)
+    return '\n'.join(rng.choice(['noop', f"addx {rng.randint(-5, 5)}"]) for i in range(n))
+
+
+def day11(n, seed=0, n_monkeys=4):
+    """ n_monkeys monkeys holding n items each
+
+        operations are kept linear (no old * old), the worry levels of
+        part 1 would otherwise grow without bounds
+    """
+    factors = [2,3,5,7,11,13,17,19,23]
+    rng = random.Random(seed)
+    groups = []
+    for m in range(n_monkeys):
+        others = [o for o in range(n_monkeys) if o != m]
+        op = rng.choice([f"old * {rng.randint(2, 19)}", f"old + {rng.randint(1, 9)}"])
+        groups.append('\n'.join([
+            f"Monkey {m}:",
+            f"  Starting items: {', '.join(str(rng.randint(50, 99)) for i in range(n))}",
+            f"  Operation: new = {op}",
+            f"  Test: divisible by {rng.choice(factors)}",
+            f"    If true: throw to monkey {rng.choice(others)}",
+            f"    If false: throw to monkey {rng.choice(others)}",
+        ]))
+    return '\n\n'.join(groups)
+
+
+def day12(n, seed=0):
+    """ n x n height map (n >= 14), the height rises by at most one per
+        step from S (top left) towards E (bottom right)
+    """
+    assert n >= 14
+    rng = random.Random(seed)
+    grid = [[(i+j)*26 // (2*n-1) for j in range(n)] for i in range(n)]
+    for row in grid: # random dips keep the map passable
+        for j in range(n):
+            if rng.random() < 0.2:
+                row[j] = max(0, row[j] - rng.randint(1, 3))
+    grid = [[chr(ord('a') + h) for h in row] for row in grid]
+    grid[0][0] = 'S'
+    grid[-1][-1] = 'E'
+    return '\n'.join(''.join(row) for row in grid)
+
+
+def day13(n, seed=0, max_depth=3):
+    """ n pairs of packets """
+    rng = random.Random(seed)
+
+    def packet(depth=0):
+        items = []
+        for i in range(rng.randint(0, 4)):
+            if depth < max_depth and rng.random() < 0.3:
+                items.append(packet(depth+1))
+            else:
+                items.append(rng.randint(0, 10))
+        return items
+
+    return '\n\n'.join(f"{packet()}\n{packet()}".replace(' ', '') for i in range(n))
+
+
+def day14(n, seed=0):
+    """ n rock paths of up to 4 straight segments
+
+        rocks stay within 465 <= x <= 535 and start at y = 40, so sand
+        can always spill past them and part 1 terminates
+    """
+    rng = random.Random(seed)
+    lines = []
+    for i in range(n):
+        x, y = rng.randint(475, 525), rng.randint(40, n + 50)
+        points = [(x, y)]
+        for j in range(rng.randint(1, 4)):
+            if j % 2:
+                y += rng.randint(1, 5)
+            else:
+                x = min(535, max(465, x + rng.choice([-1, 1]) * rng.randint(1, 8)))
+            if (x, y) != points[-1]:
+                points.append((x, y))
+        lines.append(' -> '.join(f"{x},{y}" for x,y in points))
+    return '\n'.join(lines)
+
+
+def day15(n, seed=0, area=4_000_000):
+    """ n sensors in the square (0..area) x (0..area) """
+    rng = random.Random(seed)
+    reach = max(1, area // 10)
+    lines = []
+    for i in range(n):
+        xs, ys = rng.randint(0, area), rng.randint(0, area)
+        xb, yb = xs + rng.randint(-reach, reach), ys + rng.randint(-reach, reach)
+        lines.append(f"Sensor at x={xs}, y={ys}: closest beacon is at x={xb}, y={yb}")
+    return '\n'.join(lines)
+
+
+def day17(n, seed=0):
+    """ jet pattern of n characters """
+    rng = random.Random(seed)
+    return ''.join(rng.choices('<>', k=n))
+
+
+def day21(n, seed=0):
+    """ n operations (2n+1 monkeys)
+
+        root compares two subtrees of equal value and humn appears once,
+        all divisions are exact, so part 2 has the integer solution
+        given as the value of humn
+    """
+    assert 1 <= n < 26**4 // 3
+    rng = random.Random(seed)
+    codes = iter(rng.sample(range(26**4), 2*n + 3))
+    def new_name():
+        while True:
+            c = next(codes)
+            name = ''.join(chr(ord('a') + (c // 26**k) % 26) for k in range(4))
+            if name not in ('root', 'humn'):
+                return name
+
+    value = rng.randint(1, 1000)
+    below = _split(n-1, 2, rng)
+    left, right = new_name(), new_name()
+    if below[0] == 0:
+        left = 'humn'
+    lines = [f"root: {left} + {right}"]
+
+    # (name, value, number of operations below, humn is below)
+    todo = [(left, value, below[0], True), (right, value, below[1], False)]
+    while todo:
+        name, value, below, on_path = todo.pop()
+        if below == 0:
+            lines.append(f"{name}: {value}")
+            continue
+
+        divisors = [d for d in range(2, 10) if value % d == 0]
+        op = rng.choice('+-*/')
+        if op == '+' and value < 2:
+            op = '-'
+        if op == '*' and not divisors:
+            op = '/'
+
+        if op == '+':
+            a = rng.randint(1, value-1)
+            b = value - a
+        elif op == '-':
+            b = rng.randint(1, 100)
+            a = value + b
+        elif op == '*':
+            b = rng.choice(divisors)
+            a = value // b
+        else:
+            b = rng.randint(2, 9)
+            a = value * b
+
+        n_left, n_right = _split(below-1, 2, rng)
+        path = rng.randint(0, 1) if on_path else None
+        children = []
+        for side, (v, k) in enumerate([(a, n_left), (b, n_right)]):
+            child = 'humn' if path == side and k == 0 else new_name()
+            children.append((child, v, k, path == side))
+        lines.append(f"{name}: {children[0][0]} {op} {children[1][0]}")
+        todo += children
+
+    rng.shuffle(lines)
+    return '\n'.join(lines)
+
+
+GENERATORS = {
+    '04': day04,
+    '05': day05,
+    '06': day06,
+    '07': day07,
+    '08': day08,
+    '09': day09,
+    '10': day10,
+    '11': day11,
+    '12': day12,
+    '13': day13,
+    '14': day14,
+    '15': day15,
+    '17': day17,
+    '21': day21,
+}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m helpers.generators')
+    parser.add_argument('day', choices=sorted(GENERATORS))
+    parser.add_argument('n', type=int, help='size of the input')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('-o', '--out', default=None, help='output file (default: stdout)')
+    args = parser.parse_args(argv)
+
+    s = GENERATORS[args.day](args.n, args.seed)
+    if args.out is None:
+        print(s)
+    else:
+        with open(args.out, 'w') as f:
+            f.write(s)
+
+
+if __name__ == "__main__":
+    main()
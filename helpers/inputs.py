@@ -1,4 +1,125 @@
+import mmap
 import re
+import warnings
+from itertools import chain
+
+import numpy as np
+
+
+class MappedLines():
+    """
+    Read-only sequence of lines backed by a (memory-mapped) buffer.
+
+    Only the offset of every line end is stored (4 bytes per line for
+    buffers below 2 GB), lines are decoded on access. Slicing with
+    step 1 returns a new view on the same buffer, nothing is copied.
+
+    close() releases the buffer, this invalidates all views on it.
+    """
+
+    def from_buffer(buf, block_size=1<<22):
+        """ scans buf for newlines in blocks of block_size bytes, the
+            newlines are counted first so the offsets are filled in place
+            and the temporaries stay bounded by the block size
+        """
+        n = len(buf)
+        dtype = np.int32 if n < 2**31 else np.int64
+        last = 1 if n and buf[n-1:n] != b'\n' else 0 # last line without newline
+        view = memoryview(buf)
+        blocks = range(0, n, block_size)
+
+        counts = [int(np.count_nonzero(np.frombuffer(view[lo:lo+block_size], dtype=np.uint8) == 10)) for lo in blocks]
+        # line i spans offsets[i]+1 .. offsets[i+1]
+        offsets = np.empty(1 + sum(counts) + last, dtype=dtype)
+        offsets[0] = -1
+        pos = 1
+        for lo, c in zip(blocks, counts):
+            block = np.frombuffer(view[lo:lo+block_size], dtype=np.uint8)
+            offsets[pos:pos+c] = np.flatnonzero(block == 10)
+            offsets[pos:pos+c] += lo
+            pos += c
+            del block # the view can only be released without exports
+        view.release()
+        if last:
+            offsets[-1] = n
+
+        return MappedLines(buf, offsets)
+
+    def __init__(self, buf, offsets, lo=0, hi=None):
+        self.buf = buf
+        self.offsets = offsets
+        self.lo = lo
+        self.hi = len(offsets) - 1 if hi is None else hi
+
+    def close(self):
+        if hasattr(self.buf, 'close'):
+            self.buf.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def __len__(self):
+        return self.hi - self.lo
+
+    def raw_lines(self, chunk=4096):
+        """ yields the lines as bytes """
+        for lo in range(self.lo, self.hi, chunk):
+            o = self.offsets[lo:min(lo+chunk, self.hi)+1].tolist()
+            for a, b in zip(o, o[1:]):
+                yield self.buf[a+1:b]
+
+    def raw_view(self):
+        """ zero-copy memoryview of all lines in the view """
+        if len(self) == 0:
+            return memoryview(b'')
+        return memoryview(self.buf)[int(self.offsets[self.lo])+1:int(self.offsets[self.hi])]
+
+    def raw_text(self):
+        """ bytes of all lines in the view, separated by newlines """
+        return bytes(self.raw_view())
+
+    def __iter__(self):
+        for line in self.raw_lines():
+            yield line.decode()
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            lo, hi, step = i.indices(len(self))
+            if step != 1:
+                return [self[j] for j in range(lo, hi, step)]
+            return MappedLines(self.buf, self.offsets, self.lo+lo, self.lo+max(lo, hi))
+
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError('line index out of range')
+        i += self.lo
+        return self.buf[int(self.offsets[i])+1:int(self.offsets[i+1])].decode()
+
+    def __eq__(self, other):
+        return list(self) == list(other)
+
+    def split_groups(self, sep=''):
+        """
+        same as AocData.split_groups, but returns views on the buffer
+        """
+        sep = sep.encode()
+        o = self.offsets[self.lo:self.hi+1]
+        # only lines of the right length can match
+        candidates = np.flatnonzero(np.diff(o) - 1 == len(sep))
+        L = []
+        lo = 0
+        for i in candidates.tolist():
+            if self.buf[int(o[i])+1:int(o[i+1])] == sep:
+                L.append(self[lo:i])
+                lo = i + 1
+        L.append(self[lo:])
+
+        return L
+
 
 class AocData():
     def from_str(s):
@@ -9,6 +130,20 @@ class AocData():
             data = [l.strip('\n') for l in f.readlines()]
             return AocData(data)
 
+    def from_mmap(f_in):
+        """
+        maps the file into memory instead of reading it, lines are
+        only decoded when accessed (see MappedLines). The mapping is
+        released with data.data.close() or by using data.data in a
+        with block
+        """
+        with open(f_in, 'rb') as f:
+            if f.seek(0, 2) == 0: # empty files cannot be mapped
+                buf = b''
+            else:
+                buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        return AocData(MappedLines.from_buffer(buf))
+
     def __init__(self, data):
         self.data = data
 
@@ -16,6 +151,9 @@ class AocData():
         """
         splits the data on sep and returns a list of AocData objects
         """
+        if isinstance(self.data, MappedLines):
+            return [AocData(d) for d in self.data.split_groups(sep)]
+
         L = []
         cur = []
         for x in self.data:
@@ -53,6 +191,159 @@ class DataParser():
         return [self.parse_line(line) for line in data.data]
 
 
+class ColumnParser():
+    """
+    Parses all lines at once into one numpy array per column.
+
+    columns are given as (name, kind) with kind either a numpy dtype
+    or 'category'. Categorical columns are encoded as small ints, the
+    labels are kept (sorted) in self.categories[name].
+
+    sep can be a single separator or a tuple of separators, e.g.
+    sep=('-', ',') for lines like "2-4,6-8"
+
+    lines are parsed in chunks of chunk lines straight into the output
+    arrays, purely numeric input is converted in bulk by numpy, so the
+    memory needed on top of the result is bounded by the chunk size.
+    """
+
+    def __init__(self, *columns, sep=' ', chunk=1<<14):
+        self.columns = columns
+        self.sep = (sep,) if isinstance(sep, str) else tuple(sep)
+        self.chunk = chunk
+        self.categories = {}
+
+    def is_category(kind):
+        return isinstance(kind, str) and kind == 'category'
+
+    def chunk_text(self, L, sep):
+        """ lines of L joined into one string, all separators replaced by sep """
+        if isinstance(L, MappedLines):
+            text = L.raw_text().decode()
+        else:
+            text = '\n'.join(L)
+        for other in self.sep + ('\n',):
+            if other != sep:
+                text = text.replace(other, sep)
+        return text
+
+    def parse_list(self, L):
+        n = len(self.columns)
+        numeric = not any(ColumnParser.is_category(k) for _, k in self.columns)
+        if numeric:
+            dtype = np.result_type(*[k for _, k in self.columns])
+
+        out = {}
+        labels = {}
+        for name, kind in self.columns:
+            if ColumnParser.is_category(kind):
+                out[name] = np.empty(len(L), dtype=np.int64)
+                labels[name] = {}
+            else:
+                out[name] = np.empty(len(L), dtype=kind)
+
+        for lo in range(0, len(L), self.chunk):
+            lines = L[lo:lo+self.chunk]
+            hi = lo + len(lines)
+            if numeric:
+                with warnings.catch_warnings():
+                    # malformed numbers raise instead of ending the array early
+                    warnings.simplefilter('error', DeprecationWarning)
+                    fields = np.fromstring(self.chunk_text(lines, ' '), dtype=dtype, sep=' ')
+            else:
+                text = self.chunk_text(lines, self.sep[0])
+                fields = text.split(self.sep[0]) if text else []
+            assert len(fields) == n * len(lines), "data length not matching parser"
+
+            for i, (name, kind) in enumerate(self.columns):
+                col = fields[i::n]
+                if ColumnParser.is_category(kind):
+                    chunk_labels, codes = np.unique(col, return_inverse=True)
+                    ids = [labels[name].setdefault(l, len(labels[name])) for l in chunk_labels.tolist()]
+                    out[name][lo:hi] = np.array(ids, dtype=np.int64)[codes]
+                else:
+                    out[name][lo:hi] = col
+
+        for name, ids in labels.items():
+            names = sorted(ids)
+            rank = np.empty(len(names), dtype=np.int64)
+            rank[[ids[l] for l in names]] = np.arange(len(names))
+            self.categories[name] = np.array(names)
+            out[name] = rank[out[name]].astype(np.min_scalar_type(max(len(names)-1, 0)))
+
+        return out
+
+    def parse_data(self, data):
+        return self.parse_list(data.data)
+
+
+class RegexParser():
+    """
+    Runs one regex over the whole input instead of once per line.
+
+    template is a regex with one group per field, converters are
+    applied to the groups in order (one converter per group).
+    check_len = True ensures every line produced exactly one record
+
+    MappedLines input is decoded in one go, or searched in place with
+    the bytes version of the regex if all converters are int or float.
+    """
+
+    def __init__(self, template, *converters, check_len=True):
+        self.regex = re.compile(template)
+        assert self.regex.groups == len(converters), "number of groups not matching converters"
+        self.bregex = None
+        self.converters = converters
+        self.check_len = check_len
+
+    def findall(self, data):
+        """ returns the raw groups of every match as tuples """
+        lines = data.data
+        if not isinstance(lines, MappedLines):
+            matches = self.regex.findall('\n'.join(lines))
+        elif all(c in (int, float) for c in self.converters):
+            # numbers can be parsed from bytes, search the buffer in place
+            if self.bregex is None:
+                self.bregex = re.compile(self.regex.pattern.encode())
+            matches = self.bregex.findall(lines.raw_view())
+        else:
+            matches = self.regex.findall(lines.raw_text().decode())
+
+        if self.check_len:
+            assert len(matches) == len(lines), "data length not matching parser"
+        if self.regex.groups == 1:
+            matches = [(m,) for m in matches]
+        return matches
+
+    def convert(c, col):
+        """ applies converter c to a column of raw groups """
+        if c is str:
+            return col
+        return list(map(c, col))
+
+    def parse_data(self, data):
+        """returns a list of tuples, one per record"""
+        matches = self.findall(data)
+        c = self.converters
+        if not matches or all(f is str for f in c):
+            return matches
+        if len(set(c)) == 1:
+            # one converter for everything, convert all groups in one go
+            flat = RegexParser.convert(c[0], list(chain.from_iterable(matches)))
+            return list(zip(*[iter(flat)] * len(c)))
+        return list(zip(*[RegexParser.convert(f, col) for f, col in zip(c, zip(*matches))]))
+
+    def parse_columns(self, data):
+        """
+        returns one numpy array per group, converters are used as
+        dtypes here (e.g. int, float, str)
+        """
+        matches = self.findall(data)
+        if not matches:
+            return [np.array([], dtype=c) for c in self.converters]
+        return [np.array(col, dtype=c) for c, col in zip(self.converters, zip(*matches))]
+
+
 class TerminalParser():
     def parse_data(data):
         all_cmd = []
@@ -68,3 +359,31 @@ class TerminalParser():
                 stdout.append(line)
 
         return all_cmd
+
+    def iter_lines(lines):
+        """
+        yields (cmd, stdout) pairs as soon as the output of a command is
+        complete. lines can be any iterable, e.g. AocData.data or an open
+        file (trailing newlines are stripped)
+        """
+        cmd = None
+        stdout = []
+        for line in lines:
+            line = line.rstrip('\n')
+            if line.startswith('$ '):
+                if cmd is not None:
+                    yield (cmd, stdout)
+                cmd = line[2:]
+                stdout = []
+            else:
+                stdout.append(line)
+
+        if cmd is not None:
+            yield (cmd, stdout)
+
+    def iter_data(data):
+        return TerminalParser.iter_lines(data.data)
+
+    def iter_file(f_in):
+        with open(f_in, 'r') as f:
+            yield from TerminalParser.iter_lines(f)
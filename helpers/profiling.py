@@ -0,0 +1,93 @@
+"""
+Opt-in instrumentation of the phases of a run (loading, parsing, solving).
+
+    prof = Profiler(cprofile=True, memory=True)
+    with prof.phase('init'):
+        P = Day17(data)
+    prof.dump('report.json')
+
+NULL_PROFILER has the same interface and does nothing, it is meant as
+the default so instrumented code does not need any checks.
+"""
+import cProfile
+import json
+import pstats
+import time
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+
+
+class Profiler():
+
+    def __init__(self, cprofile=False, memory=False, top=20):
+        """
+        cprofile = True records the top functions (by cumulative time)
+        memory   = True records the peak memory of each phase (tracemalloc)
+
+        phases must not be nested when cprofile is enabled
+        """
+        self.cprofile = cprofile
+        self.memory = memory
+        self.top = top
+        self.phases = []
+
+    @contextmanager
+    def phase(self, name):
+        entry = {'phase': name}
+
+        started_tracing = False
+        if self.memory:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                started_tracing = True
+            tracemalloc.reset_peak()
+
+        prof = cProfile.Profile() if self.cprofile else None
+
+        t0 = time.perf_counter()
+        if prof is not None:
+            prof.enable()
+        try:
+            yield entry
+        finally:
+            if prof is not None:
+                prof.disable()
+            entry['time'] = time.perf_counter() - t0
+
+            if self.memory:
+                entry['peak_memory'] = tracemalloc.get_traced_memory()[1]
+                if started_tracing:
+                    tracemalloc.stop()
+            if prof is not None:
+                entry['functions'] = self._top_functions(prof)
+
+            self.phases.append(entry)
+
+    def _top_functions(self, prof):
+        stats = pstats.Stats(prof).stats
+        rows = []
+        for (filename, line, func), (cc, nc, tt, ct, callers) in stats.items():
+            rows.append({'function': f"{filename}:{line}({func})", 'calls': nc, 'tottime': tt, 'cumtime': ct})
+        rows.sort(key=lambda r: r['cumtime'], reverse=True)
+        return rows[:self.top]
+
+    def report(self):
+        return list(self.phases)
+
+    def dump(self, f_out):
+        with open(f_out, 'w') as f:
+            json.dump(self.report(), f, indent=2)
+
+
+class NullProfiler():
+
+    _null = nullcontext()
+
+    def phase(self, name):
+        return self._null
+
+    def report(self):
+        return []
+
+
+NULL_PROFILER = NullProfiler()
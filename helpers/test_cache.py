@@ -0,0 +1,50 @@
+import numpy as np
+
+from helpers.cache import ParseCache
+
+
+class TestParseCache():
+    def write(self, tmp_path, s):
+        p = tmp_path / "input"
+        p.write_text(s)
+        return p
+
+    def test_array(self, tmp_path):
+        f_in = self.write(tmp_path, "12\n34")
+        calls = []
+        def parser(data):
+            calls.append(1)
+            return np.array([list(map(int, s)) for s in data.data])
+
+        cache = ParseCache(tmp_path / "cache")
+        A = cache.load(f_in, parser, 'grid')
+        B = cache.load(f_in, parser, 'grid')
+        assert len(calls) == 1
+        assert (A == B).all()
+        assert list((tmp_path / "cache").glob("grid-v1-*.npy"))
+
+    def test_tuple(self, tmp_path):
+        f_in = self.write(tmp_path, "Sb\ncE")
+        from puzzles.day12 import HeightMap
+
+        cache = ParseCache(tmp_path / "cache")
+        grid, start, end = cache.load(f_in, HeightMap.parse, 'day12')
+        assert list((tmp_path / "cache").glob("day12-v1-*-0.npy"))
+
+        A, start2, end2 = cache.load(f_in, lambda data: None, 'day12')
+        assert (A == grid).all()
+        assert (start2, end2) == (start, end) == ((0, 0), (1, 1))
+
+    def test_invalidation(self, tmp_path):
+        f_in = self.write(tmp_path, "a\nb")
+        parser = lambda data: set(data.data)
+
+        cache = ParseCache(tmp_path / "cache")
+        assert cache.load(f_in, parser, 'lines') == {'a', 'b'}
+
+        # new parser version
+        assert cache.load(f_in, lambda data: len(data.data), 'lines', version=2) == 2
+
+        # new input
+        self.write(tmp_path, "c")
+        assert cache.load(f_in, parser, 'lines') == {'c'}
@@ -0,0 +1,26 @@
+import pytest
+
+from helpers import generators
+from helpers.inputs import AocData
+
+
+@pytest.mark.parametrize('day', sorted(generators.GENERATORS))
+def test_deterministic(day):
+    g = generators.GENERATORS[day]
+    n = 20
+    assert g(n, seed=1) == g(n, seed=1)
+    assert g(n, seed=1) != g(n, seed=2)
+
+
+def test_day04():
+    data = AocData.from_str(generators.day04(50))
+    assert len(data.data) == 50
+    for line in data.data:
+        (a, b), (c, d) = (map(int, r.split('-')) for r in line.split(','))
+        assert a <= b and c <= d
+
+
+def test_day08():
+    data = AocData.from_str(generators.day08(17))
+    assert len(data.data) == 17
+    assert all(len(l) == 17 and l.isdigit() for l in data.data)
@@ -1,6 +1,8 @@
 import pytest
 
-from helpers.inputs import AocData, DataParser
+import numpy as np
+
+from helpers.inputs import AocData, DataParser, ColumnParser, RegexParser, TerminalParser
 
 class TestAocData():
     def test_from_str(self):
@@ -41,6 +43,71 @@ class TestAocData():
         assert L[2].data == ['2b', '3c']
 
 
+class TestMappedLines():
+    def write(self, tmp_path, s):
+        import os
+        p = os.path.join(tmp_path, "test")
+        with open(p, 'w') as f:
+            f.write(s)
+        return p
+
+    def test_from_mmap(self, tmp_path):
+        p = self.write(tmp_path, "1a\n2b\n3c\n")
+        d = AocData.from_mmap(p)
+        assert list(d.data) == AocData.from_file(p).data
+        assert len(d.data) == 3
+        assert d.data[0] == '1a'
+        assert d.data[-1] == '3c'
+        assert list(d.data[1:]) == ['2b', '3c']
+        assert d.data[::-1] == ['3c', '2b', '1a']
+
+    def test_from_mmap_empty(self, tmp_path):
+        p = self.write(tmp_path, "")
+        d = AocData.from_mmap(p)
+        assert list(d.data) == []
+
+    def test_offsets(self, tmp_path):
+        p = self.write(tmp_path, "1a\n\n333\n")
+        d = AocData.from_mmap(p)
+        assert d.data.offsets.dtype == np.int32
+        assert list(d.data.offsets) == [-1, 2, 3, 7]
+        assert list(d.data.raw_lines()) == [b'1a', b'', b'333']
+
+    def test_blocks(self, tmp_path):
+        import tracemalloc
+        from helpers.inputs import MappedLines
+
+        line = "2-4,6-8" + "0" * 56 + "\n"
+        s = line * 2**16 + "end"
+        buf = s.encode()
+        block_size = 1 << 16
+
+        tracemalloc.start()
+        lines = MappedLines.from_buffer(buf, block_size=block_size)
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+        assert list(lines) == s.split("\n")
+        assert list(MappedLines.from_buffer(buf, block_size=100).offsets) == list(lines.offsets)
+        # 4 MB of input, the offsets take 256 kB
+        assert peak < lines.offsets.nbytes + 16 * block_size
+
+    def test_close(self, tmp_path):
+        p = self.write(tmp_path, "1a\n2b")
+        with AocData.from_mmap(p).data as lines:
+            assert list(lines) == ['1a', '2b']
+        assert lines.buf.closed
+
+    def test_split_group(self, tmp_path):
+        p = self.write(tmp_path, "1a\n\n\n2b\n3c")
+        L = AocData.from_mmap(p).split_groups(sep='')
+        assert len(L) == 3
+        assert list(L[0].data) == ['1a']
+        assert list(L[1].data) == []
+        assert list(L[2].data) == ['2b', '3c']
+        assert L[2].data[1] == '3c'
+
+
 class TestDataParser():
     def test_constructor_single(self):
         with pytest.raises(AssertionError):
@@ -70,3 +137,100 @@ class TestDataParser():
 
         with pytest.raises(AssertionError):
             p.parse_line("1,a,b")
+
+
+class TestColumnParser():
+    def test_parse_data(self):
+        d = AocData.from_str("R 4\nU 12\nR 1")
+        p = ColumnParser(('dir', 'category'), ('count', np.int64))
+        cols = p.parse_data(d)
+        assert list(p.categories['dir']) == ['R', 'U']
+        assert list(cols['dir']) == [0, 1, 0]
+        assert cols['dir'].dtype == np.uint8
+        assert list(cols['count']) == [4, 12, 1]
+
+    def test_multiple_sep(self):
+        d = AocData.from_str("2-4,6-8\n2-3,4-5")
+        p = ColumnParser(*[(n, int) for n in 'abcd'], sep=('-', ','))
+        cols = p.parse_data(d)
+        assert list(cols['a']) == [2, 2]
+        assert list(cols['d']) == [8, 5]
+
+    def test_chunks(self, tmp_path):
+        s = "U 1\nR 2\nU 3\nD 4\nL 5"
+        p = ColumnParser(('dir', 'category'), ('count', int), chunk=2)
+        cols = p.parse_data(AocData.from_str(s))
+        assert list(p.categories['dir']) == ['D', 'L', 'R', 'U']
+        assert list(cols['dir']) == [3, 2, 3, 0, 1]
+
+        f = tmp_path / "test"
+        f.write_text(s)
+        cols = p.parse_data(AocData.from_mmap(f))
+        assert list(cols['count']) == [1, 2, 3, 4, 5]
+
+    def test_empty(self):
+        p = ColumnParser(('dir', 'category'), ('count', int))
+        cols = p.parse_list([])
+        assert len(cols['dir']) == len(cols['count']) == 0
+
+    def test_length_mismatch(self):
+        with pytest.raises(ValueError):
+            ColumnParser(('a', int), ('b', int)).parse_data(AocData.from_str("1 2\n3 x"))
+
+        d = AocData.from_str("1 2\n3")
+        p = ColumnParser(('a', int), ('b', int))
+        with pytest.raises(AssertionError):
+            p.parse_data(d)
+
+
+class TestRegexParser():
+    sample = "move 1 from 2 to 1\nmove 13 from 1 to 3"
+
+    def test_parse_data(self):
+        d = AocData.from_str(self.sample)
+        p = RegexParser(r"move (\d+) from (\d+) to (\d+)", int, str, str)
+        assert p.parse_data(d) == [(1, '2', '1'), (13, '1', '3')]
+
+    def test_parse_columns(self):
+        d = AocData.from_str(self.sample)
+        p = RegexParser(r"move (\d+) from (\d+) to (\d+)", int, int, int)
+        cnt, _from, _to = p.parse_columns(d)
+        assert list(cnt) == [1, 13]
+        assert list(_to) == [1, 3]
+
+    def test_mmap(self, tmp_path):
+        f = tmp_path / "test"
+        f.write_text(self.sample + "\n")
+        d = AocData.from_mmap(f)
+        p = RegexParser(r"move (\d+) from (\d+) to (\d+)", int, int, int)
+        assert p.parse_data(d) == [(1, 2, 1), (13, 1, 3)]
+        assert list(p.parse_columns(d)[0]) == [1, 13]
+
+        p = RegexParser(r"move (\d+) from (\d+) to (\d+)", int, str, str)
+        assert p.parse_data(d) == [(1, '2', '1'), (13, '1', '3')]
+
+    def test_check_len(self):
+        d = AocData.from_str(self.sample + "\nnoop")
+        with pytest.raises(AssertionError):
+            RegexParser(r"move (\d+)", int).parse_data(d)
+
+        p = RegexParser(r"move (\d+)", int, check_len=False)
+        assert p.parse_data(d) == [(1,), (13,)]
+
+
+class TestTerminalParser():
+    sample = "$ cd /\n$ ls\ndir a\n14848514 b.txt\n$ cd a\n$ ls"
+
+    def test_iter_data(self):
+        d = AocData.from_str(self.sample)
+        cmds = list(TerminalParser.iter_data(d))
+        assert cmds == TerminalParser.parse_data(d)
+        assert cmds[1] == ('ls', ['dir a', '14848514 b.txt'])
+        assert cmds[-1] == ('ls', [])
+
+    def test_iter_file(self, tmp_path):
+        p = tmp_path / "log"
+        p.write_text(self.sample + "\n")
+        cmds = TerminalParser.iter_file(p)
+        assert next(cmds) == ('cd /', [])
+        assert len(list(cmds)) == 3
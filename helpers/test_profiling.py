@@ -0,0 +1,29 @@
+from helpers.profiling import Profiler, NULL_PROFILER
+
+
+class TestProfiler():
+    def test_phases(self, tmp_path):
+        prof = Profiler(cprofile=True, memory=True, top=5)
+        with prof.phase('build'):
+            L = [list(range(100)) for i in range(100)]
+        with prof.phase('sum'):
+            sum(map(sum, L))
+
+        report = prof.report()
+        assert [p['phase'] for p in report] == ['build', 'sum']
+        assert report[0]['peak_memory'] > 0
+        assert len(report[1]['functions']) <= 5
+
+        prof.dump(tmp_path / 'report.json')
+        assert (tmp_path / 'report.json').exists()
+
+    def test_timer_only(self):
+        prof = Profiler()
+        with prof.phase('a'):
+            pass
+        assert set(prof.report()[0]) == {'phase', 'time'}
+
+    def test_null(self):
+        with NULL_PROFILER.phase('a'):
+            pass
+        assert NULL_PROFILER.report() == []
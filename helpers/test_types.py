@@ -0,0 +1,43 @@
+import random
+
+import numpy as np
+
+from helpers.types import MyRange, IntervalSet
+
+
+def points(S):
+    return {x for r in S for x in range(r.start, r.end+1)}
+
+
+class TestIntervalSet():
+    def test_from_ranges(self):
+        S = IntervalSet.from_ranges([MyRange(5, 8), MyRange(1, 2), MyRange(3, 3), MyRange(10, 12), MyRange(11, 11), MyRange(4, 2, check_valid=False)])
+        assert [(r.start, r.end) for r in S] == [(1, 3), (5, 8), (10, 12)]
+        assert S.size == 10
+        assert len(S) == 3
+
+    def test_empty(self):
+        S = IntervalSet.from_ranges([])
+        assert S.size == 0
+        assert not S.contains(3)
+        assert S.union(IntervalSet.from_ranges([MyRange(1, 2)])).size == 2
+
+    def test_membership(self):
+        S = IntervalSet.from_ranges([MyRange(1, 3), MyRange(7, 9)])
+        assert S.contains(1) and S.contains(9)
+        assert not S.contains(0) and not S.contains(5)
+        assert list(S.contains(np.array([0, 2, 5, 8]))) == [False, True, False, True]
+        assert S.covers(MyRange(7, 8))
+        assert not S.covers(MyRange(2, 7))
+        assert S.overlaps(MyRange(2, 7))
+        assert not S.overlaps(MyRange(4, 6))
+
+    def test_set_operations(self):
+        rng = random.Random(0)
+        for i in range(50):
+            A = IntervalSet.from_ranges(MyRange(a, a+rng.randint(0, 5)) for a in rng.sample(range(50), 8))
+            B = IntervalSet.from_ranges(MyRange(a, a+rng.randint(0, 5)) for a in rng.sample(range(50), 8))
+            assert points(A.union(B)) == points(A) | points(B)
+            assert points(A.intersection(B)) == points(A) & points(B)
+            assert points(A.difference(B)) == points(A) - points(B)
+            assert A.union(B) == IntervalSet.from_ranges(list(A) + list(B))
@@ -1,3 +1,5 @@
+import numpy as np
+
 class MyRange():
     def from_str(s):
         a,b = s.split('-')
@@ -65,3 +67,122 @@ class MyRange():
         o = self.overlap(other, check_valid=False)
         return self.size == o.size
 
+
+
+class IntervalSet():
+    """
+    Union of disjoint closed integer ranges, stored as sorted arrays of
+    starts and ends. Touching ranges (e.g. 1-2 and 3-4) are merged.
+
+    Membership queries use binary search (O(log n)), set operations are
+    computed in bulk with a sweep over all endpoints.
+    """
+
+    def from_ranges(ranges):
+        """ builds the union of an iterable of MyRange objects, invalid
+            (i.e. empty) ranges are ignored
+        """
+        pairs = [(r.start, r.end) for r in ranges if r.is_valid]
+        if not pairs:
+            return IntervalSet([], [])
+        starts, ends = np.array(pairs, dtype=np.int64).T
+        return IntervalSet.from_arrays(starts, ends)
+
+    def from_arrays(starts, ends):
+        """ same as from_ranges for arrays of starts and ends """
+        starts = np.asarray(starts, dtype=np.int64)
+        ends = np.asarray(ends, dtype=np.int64)
+        valid = starts <= ends
+        starts, ends = starts[valid], ends[valid]
+
+        order = np.argsort(starts, kind='stable')
+        starts, ends = starts[order], ends[order]
+
+        # a new interval begins wherever the start is past all previous ends
+        reach = np.maximum.accumulate(ends)
+        first = np.ones(len(starts), dtype=bool)
+        first[1:] = starts[1:] > reach[:-1] + 1
+        group = np.cumsum(first) - 1
+
+        merged_ends = np.full(first.sum(), np.iinfo(np.int64).min)
+        np.maximum.at(merged_ends, group, ends)
+        return IntervalSet(starts[first], merged_ends)
+
+    def __init__(self, starts, ends):
+        """ starts and ends must already be sorted, disjoint and
+            non-touching, use from_ranges/from_arrays otherwise
+        """
+        self.starts = np.asarray(starts, dtype=np.int64)
+        self.ends = np.asarray(ends, dtype=np.int64)
+
+    def __len__(self):
+        """ number of disjoint ranges """
+        return len(self.starts)
+
+    def __iter__(self):
+        for s, e in zip(self.starts.tolist(), self.ends.tolist()):
+            yield MyRange(s, e)
+
+    def __eq__(self, other):
+        return np.array_equal(self.starts, other.starts) and np.array_equal(self.ends, other.ends)
+
+    def __repr__(self):
+        return 'IntervalSet(' + ', '.join(f"{r.start}-{r.end}" for r in self) + ')'
+
+    @property
+    def size(self):
+        """ total number of covered points (ends inclusive) """
+        return int((self.ends - self.starts + 1).sum())
+
+    def contains(self, x):
+        """ returns True if the point x (or all points of an array) is covered """
+        i = np.searchsorted(self.starts, x, side='right') - 1
+        found = (i >= 0) & (self.ends[np.maximum(i, 0)] >= x) if len(self) else np.zeros_like(i, dtype=bool)
+        return found if np.ndim(found) else bool(found)
+
+    def covers(self, r):
+        """ returns True if MyRange r is fully covered """
+        if not r.is_valid:
+            return True
+        i = np.searchsorted(self.starts, r.start, side='right') - 1
+        return bool(i >= 0 and self.ends[i] >= r.end)
+
+    def overlaps(self, r):
+        """ returns True if MyRange r shares at least one point with the set """
+        if not r.is_valid:
+            return False
+        i = np.searchsorted(self.starts, r.end, side='right') - 1
+        return bool(i >= 0 and self.ends[i] >= r.start)
+
+    def _combine(self, other, keep):
+        """
+        sweep over the endpoints of both sets, every elementary segment
+        is labelled 1 (only self), 2 (only other) or 3 (both) and kept
+        if keep(label) is True
+        """
+        pos = np.concatenate([self.starts, self.ends+1, other.starts, other.ends+1])
+        weights = np.concatenate([
+            np.ones(len(self)), -np.ones(len(self)),
+            np.full(len(other), 2), np.full(len(other), -2),
+        ])
+        pos, inverse = np.unique(pos, return_inverse=True)
+        label = np.cumsum(np.bincount(inverse, weights=weights, minlength=len(pos))).astype(int)
+
+        mask = keep(label[:-1])
+        starts, ends = pos[:-1][mask], pos[1:][mask] - 1
+
+        # kept segments that touch belong to the same range
+        first = np.ones(len(starts), dtype=bool)
+        first[1:] = starts[1:] != ends[:-1] + 1
+        last = np.ones(len(starts), dtype=bool)
+        last[:-1] = first[1:]
+        return IntervalSet(starts[first], ends[last])
+
+    def union(self, other):
+        return self._combine(other, lambda label: label > 0)
+
+    def intersection(self, other):
+        return self._combine(other, lambda label: label == 3)
+
+    def difference(self, other):
+        return self._combine(other, lambda label: label == 1)
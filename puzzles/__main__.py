@@ -0,0 +1,29 @@
+"""
+usage: python -m puzzles [days ...] [--parts 1 2] [--data DIR] [--workers N] [--cache DIR] [--profile FILE]
+"""
+import argparse
+
+from puzzles.registry import PUZZLES, run_all, format_report, dump_profile
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m puzzles')
+    parser.add_argument('days', nargs='*', help='days to run (default: all)')
+    parser.add_argument('--parts', nargs='+', type=int, choices=(1, 2), default=(1, 2))
+    parser.add_argument('--data', default='data', help='directory holding the inputs (data/NN)')
+    parser.add_argument('--workers', type=int, default=None, help='number of worker processes')
+    parser.add_argument('--cache', default=None, help='directory for cached parsed inputs (default: no cache)')
+    parser.add_argument('--profile', default=None, help='write a per-phase profile (json) to this file')
+    args = parser.parse_args(argv)
+    for day in args.days:
+        if day not in PUZZLES:
+            parser.error(f"unknown day {day}, choose from {', '.join(sorted(PUZZLES))}")
+
+    reports = run_all(args.days or None, args.parts, args.data, args.workers, args.cache, args.profile is not None)
+    print(format_report(reports))
+    if args.profile is not None:
+        dump_profile(reports, args.profile)
+
+
+if __name__ == "__main__":
+    main()
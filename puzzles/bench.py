@@ -0,0 +1,183 @@
+"""
+Scaling benchmarks for all puzzles.
+
+Every case is run on a ladder of input sizes. The ladder starts at the
+first size (base size times a power of factor) whose run takes at least
+min_time. Construction of the DayNN object and the timed method are
+reported separately, each as the minimum over repeat runs. Peak memory
+(tracemalloc, measured in a separate run so it does not distort the
+timings) is recorded and an empirical complexity exponent k is fitted
+for both times assuming time ~ n^k.
+
+usage: python -m puzzles.bench [cases ...] [--levels 4] [--repeat 3] [--min-time 0.1] [--out bench_output.txt]
+"""
+import argparse
+import time
+import tracemalloc
+
+import numpy as np
+
+from helpers import generators
+from helpers.inputs import AocData
+from puzzles.registry import get_puzzle
+
+def _search_area(P):
+    # random sensor layouts rarely leave exactly one gap, the candidate
+    # search before the final check is what gets timed here
+    try:
+        P.search_area_v2(4_000_000)
+    except AssertionError:
+        pass
+
+# name -> (day, input generator, base size, method to time)
+# (day 12 gets a higher iteration limit, the default fits the real input)
+CASES = {
+    '04.solve1': ('04', generators.day04, 1000, lambda P: P.solve1()),
+    '04.solve2': ('04', generators.day04, 1000, lambda P: P.solve2()),
+    '05.solve1': ('05', generators.day05, 200, lambda P: P.solve1()),
+    '05.solve2': ('05', generators.day05, 200, lambda P: P.solve2()),
+    '06.solve1': ('06', generators.day06, 10000, lambda P: P.solve1()),
+    '06.solve2': ('06', generators.day06, 10000, lambda P: P.solve2()),
+    '07.solve1': ('07', generators.day07, 500, lambda P: P.solve1()),
+    '07.solve2': ('07', generators.day07, 500, lambda P: P.solve2()),
+    '08.solve1': ('08', generators.day08, 25, lambda P: P.solve1()),
+    '08.solve2': ('08', generators.day08, 25, lambda P: P.solve2()),
+    '09.solve1': ('09', generators.day09, 100, lambda P: P.solve1()),
+    '09.solve2': ('09', generators.day09, 100, lambda P: P.solve2()),
+    '10.solve1': ('10', generators.day10, 500, lambda P: P.solve1()),
+    '10.solve2': ('10', generators.day10, 500, lambda P: P.solve2()),
+    '11.solve1': ('11', generators.day11, 100, lambda P: P.solve1()),
+    '12.solve1': ('12', generators.day12, 16, lambda P: P.M.find_route_up(limit=10**6)),
+    '12.solve2': ('12', generators.day12, 16, lambda P: P.M.find_route_down(limit=10**6)),
+    '13.solve1': ('13', generators.day13, 100, lambda P: P.solve1()),
+    '13.solve2': ('13', generators.day13, 100, lambda P: P.solve2()),
+    '14.fill_no_floor': ('14', generators.day14, 10, lambda P: P.cave.fill_no_floor()),
+    '14.fill_with_floor': ('14', generators.day14, 10, lambda P: P.cave.fill_with_floor(offset=2)),
+    '15.find_covered': ('15', generators.day15, 20, lambda P: P.find_covered(2_000_000, 1)),
+    '15.search_area_v2': ('15', generators.day15, 5, _search_area),
+    '17.__init__': ('17', generators.day17, 20, lambda P: None),
+    '21.solve1': ('21', generators.day21, 100, lambda P: P.solve1()),
+    '21.solve2': ('21', generators.day21, 100, lambda P: P.solve2()),
+}
+
+
+def measure(case, n, seed=0, repeat=3, memory=True, max_time=None):
+    """ returns (construction time, method time, peak memory) of the case
+        at size n. Both times are the minimum over repeat runs (timeit
+        style), every run works on a freshly constructed DayNN object.
+        Runs longer than max_time are not repeated. The peak memory covers
+        construction and method (None if memory is False)
+    """
+    day, build, base, run = CASES[case]
+    cls = get_puzzle(day)
+    data = AocData.from_str(build(n, seed))
+
+    builds, runs = [], []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        P = cls(data)
+        t1 = time.perf_counter()
+        run(P)
+        t2 = time.perf_counter()
+        builds.append(t1 - t0)
+        runs.append(t2 - t1)
+        if max_time is not None and t2 - t0 > max_time:
+            break
+
+    peak = None
+    if memory:
+        tracemalloc.start()
+        run(cls(data))
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+    return min(builds), min(runs), peak
+
+
+def start_size(case, min_time=0.1, factor=2, seed=0, max_steps=12):
+    """ grows the base size until one run takes at least min_time,
+        smaller inputs are dominated by timer noise
+    """
+    n = CASES[case][2]
+    for _ in range(max_steps):
+        t_build, t_run, _ = measure(case, n, seed, repeat=1, memory=False)
+        if t_build + t_run >= min_time:
+            break
+        n *= factor
+    return n
+
+
+def fit_exponent(sizes, times):
+    """ least squares fit of log(time) = k log(n) + c, returns k """
+    return np.polyfit(np.log(sizes), np.log(np.maximum(times, 1e-9)), 1)[0]
+
+
+def run_case(case, levels=4, factor=2, seed=0, repeat=3, min_time=0.1, max_time=10):
+    """ measures the case on levels sizes, starting at the first size that
+        takes min_time. The ladder stops early once a run takes longer
+        than max_time (at least two sizes are always measured)
+    """
+    n = start_size(case, min_time, factor, seed)
+    sizes, builds, times, peaks = [], [], [], []
+    for i in range(levels):
+        t_build, t_run, peak = measure(case, n, seed, repeat, max_time=max_time)
+        sizes.append(n)
+        builds.append(t_build)
+        times.append(t_run)
+        peaks.append(peak)
+        if i >= 1 and t_build + t_run > max_time:
+            break
+        n *= factor
+
+    return {
+        'case': case,
+        'sizes': sizes,
+        'build_times': builds,
+        'times': times,
+        'peaks': peaks,
+        'build_exponent': fit_exponent(sizes, builds),
+        'exponent': fit_exponent(sizes, times),
+    }
+
+
+def format_exponent(times, k):
+    # exponents of sub-millisecond timings are noise
+    return f"n^{k:.2f}" if max(times) >= 1e-3 else "negligible"
+
+
+def format_result(r):
+    build = format_exponent(r['build_times'], r['build_exponent'])
+    method = format_exponent(r['times'], r['exponent'])
+    lines = [f"{r['case']}: construction ~ {build}, method ~ {method}"]
+    for n, b, t, m in zip(r['sizes'], r['build_times'], r['times'], r['peaks']):
+        lines.append(f"    n={n:<10} {b:>10.4f} s {t:>10.4f} s {m/2**20:>10.2f} MiB")
+    return '\n'.join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m puzzles.bench')
+    parser.add_argument('cases', nargs='*', help='cases to run (default: all)')
+    parser.add_argument('--levels', type=int, default=4, help='number of sizes in the ladder (at least 2)')
+    parser.add_argument('--factor', type=int, default=2, help='growth factor between sizes')
+    parser.add_argument('--repeat', type=int, default=3, help='runs per size, the fastest one is reported')
+    parser.add_argument('--min-time', type=float, default=0.1, help='smallest size is grown until a run takes this long [s]')
+    parser.add_argument('--max-time', type=float, default=10, help='stop growing once a run takes this long [s]')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--out', default='bench_output.txt')
+    args = parser.parse_args(argv)
+    if args.levels < 2:
+        parser.error("at least 2 levels are needed to fit an exponent")
+    for case in args.cases:
+        if case not in CASES:
+            parser.error(f"unknown case {case}, choose from {', '.join(CASES)}")
+
+    with open(args.out, 'w') as f:
+        for case in args.cases or CASES:
+            r = run_case(case, args.levels, args.factor, args.seed, args.repeat, args.min_time, args.max_time)
+            text = format_result(r)
+            print(text, flush=True)
+            f.write(text + '\n')
+
+
+if __name__ == "__main__":
+    main()
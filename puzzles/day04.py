@@ -1,20 +1,196 @@
 import os
 
-from helpers.inputs import AocData, DataParser
+import numpy as np
+
+from helpers.inputs import AocData, ColumnParser
 from helpers.types import MyRange
 
+class SectionPairs():
+    """
+    All assignment pairs as four int arrays (start and end of the
+    first and second range), comparisons are done on whole arrays.
+    """
+
+    def from_data(data):
+        p = ColumnParser(*[(c, np.int64) for c in ('s1', 'e1', 's2', 'e2')], sep=('-', ','))
+        cols = p.parse_data(data)
+        return SectionPairs(cols['s1'], cols['e1'], cols['s2'], cols['e2'])
+
+    def __init__(self, s1, e1, s2, e2):
+        self.s1 = s1
+        self.e1 = e1
+        self.s2 = s2
+        self.e2 = e2
+
+    def __len__(self):
+        return len(self.s1)
+
+    def __getitem__(self, i):
+        """ returns pair i as two MyRange objects """
+        return MyRange(int(self.s1[i]), int(self.e1[i])), MyRange(int(self.s2[i]), int(self.e2[i]))
+
+    @property
+    def fully_contained(self):
+        """ True where one range of the pair fully contains the other """
+        first = (self.s1 <= self.s2) & (self.e2 <= self.e1)
+        second = (self.s2 <= self.s1) & (self.e1 <= self.e2)
+        return first | second
+
+    @property
+    def overlapping(self):
+        """ True where the ranges of the pair share at least one section """
+        return np.maximum(self.s1, self.s2) <= np.minimum(self.e1, self.e2)
+
+    def index(self):
+        """ returns an AssignmentIndex over both ranges of all pairs """
+        pair_ids = np.arange(len(self))
+        return AssignmentIndex(
+            np.concatenate([self.s1, self.s2]),
+            np.concatenate([self.e1, self.e2]),
+            np.concatenate([pair_ids, pair_ids]),
+        )
+
+
+class AssignmentIndex():
+    """
+    Static index answering queries on a set of assignments (ranges).
+
+    Assignments are sorted by start, so all assignments with start <= a
+    form a prefix. Row k-1 of self.levels holds the assignment positions
+    sorted by end within blocks of F**k assignments (F = 16). A prefix
+    splits into at most F-1 blocks per level plus fewer than F single
+    assignments, the blocks are binary searched for the first end >= b
+    all at once. With L = log_F(n) levels, counting the assignments
+    with start <= a and end >= b takes O(F L log(n)), listing them
+    O(F L log(n) + k).
+
+    Memory is one int32 position per assignment and level on top of the
+    sorted starts, ends and ids, a million assignments take 5 levels
+    (20 MB) whatever the section numbers are.
+    """
+
+    F = 16
+
+    def from_ranges(ranges):
+        """ index over a list of MyRange objects, ids are the list positions """
+        starts = np.array([r.start for r in ranges], dtype=np.int64)
+        ends = np.array([r.end for r in ranges], dtype=np.int64)
+        return AssignmentIndex(starts, ends)
+
+    def __init__(self, starts, ends, ids=None):
+        starts, ends = np.asarray(starts), np.asarray(ends)
+        ids = np.arange(len(starts)) if ids is None else np.asarray(ids)
+        n = self.n = len(starts)
+
+        order = np.argsort(starts, kind='stable')
+        self.starts = starts[order]
+        self.ends = ends[order]
+        id_type = np.int32 if n == 0 or ids.max() < 2**31 else np.int64
+        self.ids = ids.astype(id_type)[order]
+        del order
+
+        n_levels = 0
+        while n > 1 and AssignmentIndex.F ** n_levels < n:
+            n_levels += 1
+        self.levels = np.empty((n_levels, n), dtype=np.int32)
+        block = np.arange(n, dtype=np.int64)
+        for k in range(n_levels):
+            block //= AssignmentIndex.F
+            self.levels[k] = np.lexsort((self.ends, block))
+        del block
+
+        self._build_coverage()
+
+    def _build_coverage(self):
+        """ number of assignments per section, as constant segments """
+        ends = np.sort(self.ends)
+        distinct = lambda a: a[np.concatenate([a[:1] == a[:1], a[1:] != a[:-1]])] # a is sorted
+        pos = np.union1d(distinct(self.starts), distinct(ends) + 1)
+        # assignments started at or before pos minus those ended before it
+        depth = np.searchsorted(self.starts, pos, side='right') - np.searchsorted(ends, pos - 1, side='right')
+
+        self.segment_starts = pos[:-1]
+        self.segment_ends = pos[1:] - 1
+        self.segment_depth = depth[:-1]
+        self.segment_order = np.argsort(-self.segment_depth, kind='stable')
+
+    def _search(self, r):
+        """
+        returns (rows, cut, hi, rest): the assignments with start <= r.start
+        and end >= r.end are self.levels[row, cut:hi] for every block and
+        the single positions rest
+        """
+        p = int(np.searchsorted(self.starts, r.start, side='right'))
+        rows, lo, hi = [], [], []
+        pos = 0
+        for k in range(len(self.levels), 0, -1):
+            size = AssignmentIndex.F ** k
+            while pos + size <= p:
+                rows.append(k-1)
+                lo.append(pos)
+                hi.append(pos + size)
+                pos += size
+        rest = np.arange(pos, p)
+        rest = rest[self.ends[rest] >= r.end]
+
+        rows = np.array(rows, dtype=np.int64)
+        hi = np.array(hi, dtype=np.int64)
+        cut, top = np.array(lo, dtype=np.int64), hi.copy()
+        # binary search in all blocks at once, ends are sorted within a block
+        while (cut < top).any():
+            mid = (cut + top) // 2
+            active = cut < top
+            ok = self.ends[self.levels[rows, np.minimum(mid, self.n-1)]] >= r.end
+            top = np.where(active & ok, mid, top)
+            cut = np.where(active & ~ok, mid + 1, cut)
+        return rows, cut, hi, rest
+
+    def count_covering(self, r):
+        """ number of assignments fully covering MyRange r """
+        rows, cut, hi, rest = self._search(r)
+        return int((hi - cut).sum()) + len(rest)
+
+    def covering(self, r):
+        """ ids of all assignments fully covering MyRange r """
+        rows, cut, hi, rest = self._search(r)
+        lengths = hi - cut
+        # positions cut..hi-1 of every block in one gather
+        within = np.arange(lengths.sum()) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+        found = self.levels[np.repeat(rows, lengths), np.repeat(cut, lengths) + within]
+        return self.ids[np.concatenate([found, rest]).astype(np.int64)]
+
+    def touching(self, x):
+        """ ids of all assignments containing section x, sorted """
+        return np.unique(self.covering(MyRange(x, x)))
+
+    def most_overlapped(self, k):
+        """ returns the k sections covered by the most assignments as
+            a list of (section, count), ties are ordered by section
+        """
+        out = []
+        for i in self.segment_order:
+            depth = int(self.segment_depth[i])
+            if len(out) == k or depth == 0:
+                break
+            start, end = int(self.segment_starts[i]), int(self.segment_ends[i])
+            out += [(x, depth) for x in range(start, min(end+1, start + k - len(out)))]
+        return out
+
+
 class Day04():
 
     def __init__(self, data):
-        p = DataParser(MyRange.from_str, MyRange.from_str, sep=',')
-        self.pairs = p.parse_data(data)
+        self.sections = SectionPairs.from_data(data)
+
+    @property
+    def pairs(self):
+        return [self.sections[i] for i in range(len(self.sections))]
 
     def solve1(self):
-        fully_contained = lambda r1, r2: r1.fully_contains(r2) or r2.fully_contains(r1)
-        return sum(fully_contained(*r) for r in self.pairs)
+        return int(self.sections.fully_contained.sum())
 
     def solve2(self):
-        return sum(r1.overlap(r2).size > 0 for r1,r2 in self.pairs)
+        return int(self.sections.overlapping.sum())
 
 
 
@@ -31,6 +207,61 @@ class Test04():
         p = Day04(data)
         assert p.solve1() == 2
 
+    def test_2(self):
+        data = AocData.from_str(sample)
+        p = Day04(data)
+        assert p.solve2() == 4
+
+    def test_pairs(self):
+        from helpers.generators import day04
+
+        data = AocData.from_str(day04(500, seed=1))
+        p = Day04(data)
+        fully_contained = lambda r1, r2: r1.fully_contains(r2) or r2.fully_contains(r1)
+        assert p.solve1() == sum(fully_contained(*r) for r in p.pairs)
+        assert p.solve2() == sum(r1.overlap(r2).size > 0 for r1,r2 in p.pairs)
+
+    def test_index(self):
+        from helpers.generators import day04
+
+        data = AocData.from_str(day04(300, seed=2, max_section=40))
+        p = Day04(data)
+        I = p.sections.index()
+        ranges = [(i, r) for i, pair in enumerate(p.pairs) for r in pair]
+
+        for a, b in [(1, 1), (5, 20), (17, 18), (40, 40), (0, 99)]:
+            q = MyRange(a, b)
+            assert I.count_covering(q) == sum(r.start <= a and r.end >= b for i, r in ranges)
+            assert sorted(I.covering(q)) == sorted(i for i, r in ranges if r.start <= a and r.end >= b)
+
+        for x in [0, 1, 13, 40, 41]:
+            expected = sorted({i for i, r in ranges if r.start <= x <= r.end})
+            assert list(I.touching(x)) == expected
+
+        count = {x: sum(r.start <= x <= r.end for i, r in ranges) for x in range(1, 41)}
+        top = I.most_overlapped(5)
+        assert [c for x, c in top] == sorted(count.values(), reverse=True)[:5]
+        assert all(count[x] == c for x, c in top)
+
+    def test_index_wide(self):
+        import random
+        rng = random.Random(3)
+        ranges = []
+        for i in range(1000): # many distinct sections
+            a = rng.randint(0, 10**6)
+            ranges.append(MyRange(a, a + rng.randint(0, 10**5)))
+        I = AssignmentIndex.from_ranges(ranges)
+        assert I.levels.shape == (3, 1000) and I.levels.dtype == np.int32
+
+        for _ in range(50):
+            a = rng.randint(0, 10**6)
+            q = MyRange(a, a + rng.randint(0, 10**5))
+            expected = [i for i, r in enumerate(ranges) if r.start <= q.start and r.end >= q.end]
+            assert I.count_covering(q) == len(expected)
+            assert sorted(I.covering(q)) == expected
+
+        assert AssignmentIndex.from_ranges([]).count_covering(MyRange(1, 2)) == 0
+
 
 if __name__ == "__main__":
     f = os.path.join('data/04')
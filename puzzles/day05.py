@@ -1,7 +1,72 @@
 import os
-import re
 
-from helpers.inputs import AocData
+from helpers.inputs import AocData, RegexParser
+
+
+class ChunkedStack():
+    """
+    Stack stored as a list of segments (bottom to top). A segment is a
+    view (seq, lo, hi, reverse) on an immutable sequence, with reverse
+    the crates of seq[lo:hi] are stacked in reversed order.
+
+    Taking crates from the top splits at most one segment and never
+    copies crates, moving count crates costs O(number of segments).
+    """
+
+    def __init__(self, crates=()):
+        crates = tuple(crates)
+        self.segments = [(crates, 0, len(crates), False)] if crates else []
+        self.size = len(crates)
+
+    def __len__(self):
+        return self.size
+
+    def __iter__(self):
+        """ iterates over the crates from bottom to top """
+        for seq, lo, hi, reverse in self.segments:
+            yield from (seq[hi-1:lo-1 if lo else None:-1] if reverse else seq[lo:hi])
+
+    def __getitem__(self, i):
+        """ returns crate i (counted from the bottom) """
+        for seq, lo, hi, reverse in self.segments:
+            if i < hi - lo:
+                return seq[hi-1-i] if reverse else seq[lo+i]
+            i -= hi - lo
+        raise IndexError('stack index out of range')
+
+    @property
+    def top(self):
+        seq, lo, hi, reverse = self.segments[-1]
+        return seq[lo] if reverse else seq[hi-1]
+
+    def take(self, count):
+        """ removes the top count crates, returns them as segments (bottom to top) """
+        assert count <= self.size, "not enough crates on stack"
+        self.size -= count
+        taken = []
+        while count:
+            seq, lo, hi, reverse = self.segments[-1]
+            if hi - lo <= count:
+                taken.append(self.segments.pop())
+                count -= hi - lo
+            elif reverse:
+                self.segments[-1] = (seq, lo+count, hi, True)
+                taken.append((seq, lo, lo+count, True))
+                count = 0
+            else:
+                self.segments[-1] = (seq, lo, hi-count, False)
+                taken.append((seq, hi-count, hi, False))
+                count = 0
+        return taken[::-1]
+
+    def put(self, segments, reverse=False):
+        """ puts segments (bottom to top) on the stack, reverse = True
+            stacks them in reversed order (as if moved one by one)
+        """
+        if reverse:
+            segments = [(seq, lo, hi, not r) for seq, lo, hi, r in segments[::-1]]
+        self.segments += segments
+        self.size += sum(hi - lo for seq, lo, hi, r in segments)
 
 
 class MultiStack():
@@ -21,27 +86,54 @@ class MultiStack():
 
     def __init__(self, names, stacks):
         self.names = names
-        self.stack_dict = {n:s for n,s in zip(names, stacks)}
+        self.stack_dict = {n:ChunkedStack(s) for n,s in zip(names, stacks)}
 
     def move_one_by_one(self, count, from_stack, to_stack):
-        for i in range(count):
-            self.stack_dict[to_stack].append(self.stack_dict[from_stack].pop())
+        """moving crates one by one is a bulk move in reversed order"""
+        crates = self.stack_dict[from_stack].take(count)
+        self.stack_dict[to_stack].put(crates, reverse=True)
 
     def move_stack(self, count, from_stack, to_stack):
-        self.stack_dict[to_stack] += self.stack_dict[from_stack][-count:]
-        self.stack_dict[from_stack] = self.stack_dict[from_stack][:-count]
+        crates = self.stack_dict[from_stack].take(count)
+        self.stack_dict[to_stack].put(crates)
 
     @property
     def tops(self):
         """returns the top (final) element of all stacks as one string"""
-        return ''.join(self.stack_dict[n][-1] for n in self.names)
+        return ''.join(self.stack_dict[n].top for n in self.names)
+
+    def trace_tops(self, actions, one_by_one=False):
+        """
+        returns the tops after applying all actions without moving any
+        crates: the final top positions are traced back through the
+        actions to the crates they started as. Costs O(stacks * actions)
+        independent of the number of crates moved. The stacks are not
+        modified.
+        """
+        heights = {n: len(s) for n, s in self.stack_dict.items()}
+        for (_cnt, _from, _to) in actions:
+            heights[_from] -= _cnt
+            heights[_to] += _cnt
+        assert all(heights[n] > 0 for n in self.names), "empty stack at the end"
+
+        # (stack, index from bottom) of every final top, walking backwards
+        pos = [(n, heights[n]-1) for n in self.names]
+        for (_cnt, _from, _to) in reversed(actions):
+            heights[_from] += _cnt
+            heights[_to] -= _cnt
+            for k, (s, i) in enumerate(pos):
+                if s == _to and i >= heights[_to]:
+                    offset = i - heights[_to]
+                    if one_by_one:
+                        pos[k] = (_from, heights[_from] - 1 - offset)
+                    else:
+                        pos[k] = (_from, heights[_from] - _cnt + offset)
+
+        return ''.join(self.stack_dict[s][i] for s, i in pos)
 
 def parse_actions(data):
-
-    r = re.compile(r"move (\d*) from (\d*) to (\d*)")
-    parse_line = lambda s: r.findall(s)[0]
-
-    return [parse_line(s) for s in data.data]
+    p = RegexParser(r"move (\d*) from (\d*) to (\d*)", str, str, str)
+    return [(int(cnt), _from, _to) for cnt, _from, _to in p.parse_data(data)]
 
 
 class Day05():
@@ -50,12 +142,16 @@ class Day05():
         self.state = MultiStack.from_data(init)
         self.actionlist = parse_actions(actions)
 
-    def solve1(self):
+    def solve1(self, tops_only=False):
+        if tops_only:
+            return self.state.trace_tops(self.actionlist, one_by_one=True)
         for (_cnt, _from, _to) in self.actionlist:
             self.state.move_one_by_one(int(_cnt), _from, _to)
         return self.state.tops
 
-    def solve2(self):
+    def solve2(self, tops_only=False):
+        if tops_only:
+            return self.state.trace_tops(self.actionlist)
         for (_cnt, _from, _to) in self.actionlist:
             self.state.move_stack(int(_cnt), _from, _to)
         return self.state.tops
@@ -83,6 +179,32 @@ class Test05():
         p = Day05(data)
         assert p.solve2() == 'MCD'
 
+    def test_tops_only(self):
+        from helpers.generators import day05
+
+        for s in [sample, day05(200, seed=4)]:
+            data = AocData.from_str(s)
+            assert Day05(data).solve1(tops_only=True) == Day05(data).solve1()
+            assert Day05(data).solve2(tops_only=True) == Day05(data).solve2()
+
+    def test_chunked_stack(self):
+        import random
+        rng = random.Random(0)
+        ref = [list('ABCDE'), list('FGH'), list('IJKLMNOP')]
+        S = [ChunkedStack(s) for s in ref]
+        for i in range(500):
+            src, dst = rng.sample(range(3), 2)
+            if not ref[src]:
+                continue
+            count = rng.randint(1, len(ref[src]))
+            moved = ref[src][-count:]
+            ref[src] = ref[src][:-count]
+            reverse = rng.random() < 0.5
+            ref[dst] += moved[::-1] if reverse else moved
+            S[dst].put(S[src].take(count), reverse=reverse)
+            assert [list(s) for s in S] == ref
+            assert [len(s) for s in S] == [len(r) for r in ref]
+
 
 if __name__ == "__main__":
     f = os.path.join('data/05')
@@ -1,4 +1,6 @@
 import os
+import mmap
+from concurrent.futures import ProcessPoolExecutor
 
 from helpers.inputs import AocData
 
@@ -10,15 +12,128 @@ def find_first_marker(s, size=4):
     L = [len(set(t)) == size for t in zip(*I)]
     return L.index(True) + size
 
+
+class MarkerDetector():
+    """
+    Single pass marker detection on a stream fed in chunks.
+
+    Keeps the last position of every character and the start of the
+    longest run of distinct characters ending at the current position.
+    A marker of size k ends where that run first reaches length k, so
+    all sizes are found in the same pass in O(1) per character.
+    """
+
+    def __init__(self, sizes=(4, 14)):
+        self.sizes = sorted(sizes)
+        self.markers = {} # size -> same result as find_first_marker
+        self.pos = 0
+        self.run_start = 0
+        self.last = {}
+
+    @property
+    def done(self):
+        return len(self.markers) == len(self.sizes)
+
+    def feed(self, chunk):
+        """ processes the next chunk (str or bytes), returns True once
+            all markers have been found
+        """
+        last = self.last
+        run_start = self.run_start
+        pending = [k for k in self.sizes if k not in self.markers]
+        pos = self.pos
+        for c in chunk:
+            prev = last.get(c, -1)
+            if prev >= run_start:
+                run_start = prev + 1
+            last[c] = pos
+            pos += 1
+            while pending and pos - run_start >= pending[0]:
+                self.markers[pending.pop(0)] = pos
+            if not pending:
+                break
+
+        self.pos = pos
+        self.run_start = run_start
+        return self.done
+
+
+def find_markers(stream, sizes=(4, 14), chunk_size=1 << 16):
+    """
+    reads a file like object (anything with .read(n), e.g. an open file
+    or socket.makefile()) in chunks until markers of all sizes are found,
+    returns {size: marker}
+    """
+    D = MarkerDetector(sizes)
+    while not D.done:
+        chunk = stream.read(chunk_size)
+        if not chunk:
+            break
+        D.feed(chunk)
+    return D.markers
+
+def _search_chunk(f_in, start, end, n, size):
+    """ first marker of a window starting in [start, end), or None """
+    with open(f_in, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+        D = MarkerDetector((size,))
+        D.feed(buf[start:min(end+size-1, n)])
+        return start + D.markers[size] if D.done else None
+
+
+def find_first_marker_parallel(f_in, size=4, workers=None, chunk_size=1 << 24):
+    """
+    same result as find_first_marker on the (single line) file f_in.
+
+    The file is split into chunks overlapping by size-1 characters which
+    are searched on a process pool, every worker maps the file itself.
+    Chunks are collected in order, once a marker is found all later
+    chunks that have not started yet are cancelled. shutdown(wait=True)
+    still waits for the chunks that are already running, so returning
+    can take up to one more chunk search per worker.
+    """
+    with open(f_in, 'rb') as f:
+        n = f.seek(0, 2)
+        if n:
+            f.seek(n-1)
+            n -= f.read(1) == b'\n'
+
+    pool = ProcessPoolExecutor(max_workers=workers)
+    try:
+        futures = [pool.submit(_search_chunk, f_in, s, min(s+chunk_size, n), n, size) for s in range(0, n, chunk_size)]
+        for fut in futures:
+            marker = fut.result()
+            if marker is not None:
+                return marker
+    finally:
+        pool.shutdown(wait=True, cancel_futures=True)
+
+    raise ValueError('no marker found')
+
+
 class Day06():
-    def __init__(self, data):
-        self.buffer = data.data[0]
+    def __init__(self, data, workers=None):
+        """ data is an AocData object or the path of the input file, a
+            path is searched in parallel by find_first_marker_parallel
+            on workers processes without reading the file
+        """
+        if isinstance(data, AocData):
+            self.buffer = data.data[0]
+            self.path = None
+        else:
+            self.buffer = None
+            self.path = data
+        self.workers = workers
+
+    def find(self, size):
+        if self.path is None:
+            return find_first_marker(self.buffer, size)
+        return find_first_marker_parallel(self.path, size, self.workers)
 
     def solve1(self):
-        return find_first_marker(self.buffer, 4)
+        return self.find(4)
 
     def solve2(self):
-        return find_first_marker(self.buffer, 14)
+        return self.find(14)
 
 samples = [
     "mjqjpqmgbljsphdztnvjfqwrcgsmlb",
@@ -43,6 +158,29 @@ class Test06():
             p = Day06(data)
             assert p.solve2() == r
 
+    def test_stream(self):
+        import io
+        results = [(7, 19), (5, 23), (6, 23), (10, 29), (11, 26)]
+        for s, (r1, r2) in zip(samples, results):
+            assert find_markers(io.StringIO(s), chunk_size=3) == {4: r1, 14: r2}
+            assert find_markers(io.BytesIO(s.encode())) == {4: r1, 14: r2}
+
+        assert find_markers(io.StringIO("abcabc"), sizes=(4,)) == {}
+
+    def test_parallel(self, tmp_path):
+        from helpers.generators import day06
+
+        f = tmp_path / "06"
+        for s in samples + [day06(5000, seed=1)]:
+            f.write_text(s + "\n")
+            for size in (4, 14):
+                r = find_first_marker_parallel(f, size, workers=2, chunk_size=7)
+                assert r == find_first_marker(s, size)
+
+        p = Day06(f, workers=2)
+        assert p.solve1() == Day06(AocData.from_str(s)).solve1()
+        assert p.solve2() == Day06(AocData.from_str(s)).solve2()
+
 
 if __name__ == "__main__":
     f = os.path.join('data/06')
@@ -1,10 +1,13 @@
 import os
 import re
+from array import array
+from bisect import bisect_left, insort
+
+import numpy as np
 
 from helpers.inputs import AocData, TerminalParser
 
 class FsObject():
-    all_objects = []
 
     def from_str(s):
         check_dir = re.findall(r"dir (\w+)", s)
@@ -21,41 +24,255 @@ class FsObject():
         self.is_dir = is_dir
         self.size = int(size)
         self.contains = []
-        FsObject.all_objects.append(self)
+        self.children = {} # name -> FsObject
+        self._treesize = None if is_dir else self.size
+
+    def set_contents(self, objects):
+        self.contains = objects
+        self.children = {o.name: o for o in objects}
+        self._treesize = None
+
+    def walk(self):
+        """ iterates over all objects in the tree (including self) """
+        todo = [self]
+        while todo:
+            obj = todo.pop()
+            yield obj
+            todo += obj.contains
 
     @property
     def treesize(self):
-        return self.size + sum(x.treesize for x in self.contains)
+        """ size including all contents, computed once in post-order
+            and cached, only subtrees without a cached size are visited
+        """
+        if self._treesize is None:
+            todo = [(self, False)]
+            while todo:
+                obj, expanded = todo.pop()
+                if expanded:
+                    obj._treesize = obj.size + sum(x._treesize for x in obj.contains)
+                else:
+                    todo.append((obj, True))
+                    todo += [(x, False) for x in obj.contains if x._treesize is None]
+        return self._treesize
 
     def get_by_name(self, name):
-        for f in self.contains:
-            if f.name == name:
-                return f
+        return self.children.get(name)
+
+class FlatFs():
+    """
+    Compact filesystem tree, object i is described by parent[i],
+    size[i] (own size, 0 for directories), is_dir[i] and name_id[i]
+    (index into names, every name is stored once). Object 0 is the root.
+
+    Objects are numbered in the order they are listed, so parents always
+    come before their children. Only directories are indexed by name
+    (for cd), a directory that is listed again is skipped.
+    """
+
+    def from_cmds(cmds):
+        parent = array('q', [-1])
+        size = array('q', [0])
+        is_dir = array('b', [1])
+        depth = array('q', [0])
+        name_id = array('q', [0])
+        names = ['/']
+        name_index = {'/': 0}
+        subdirs = {} # (dir, name_id) -> directory object
+        listed = set() # directories whose listing was read
+
+        cur = 0
+        for (cmd, stdout) in cmds:
+            if cmd == 'ls':
+                if cur in listed:
+                    continue
+                listed.add(cur)
+                for s in stdout:
+                    info, name = s.split(' ', 1)
+                    nid = name_index.setdefault(name, len(names))
+                    if nid == len(names):
+                        names.append(name)
+
+                    parent.append(cur)
+                    depth.append(depth[cur] + 1)
+                    name_id.append(nid)
+                    if info == 'dir':
+                        subdirs[(cur, nid)] = len(parent) - 1
+                        size.append(0)
+                        is_dir.append(1)
+                    else:
+                        size.append(int(info))
+                        is_dir.append(0)
+            elif cmd == 'cd /':
+                cur = 0
+            elif cmd == 'cd ..':
+                cur = parent[cur]
+            elif cmd.startswith('cd '):
+                cur = subdirs[(cur, name_index[cmd[3:]])]
+            else:
+                raise AssertionError("cmd not known or expected")
+
+        # the arrays always hold the root, frombuffer shares their memory
+        return FlatFs(
+            np.frombuffer(parent, dtype=np.int64),
+            np.frombuffer(size, dtype=np.int64),
+            np.frombuffer(is_dir, dtype=np.int8).astype(bool),
+            np.frombuffer(depth, dtype=np.int64),
+            np.frombuffer(name_id, dtype=np.int64),
+            names,
+        )
+
+    def __init__(self, parent, size, is_dir, depth, name_id, names):
+        self.parent = parent
+        self.size = size
+        self.is_dir = is_dir
+        self.depth = depth
+        self.name_id = name_id
+        self.names = names
+        self.treesize = self.accumulate_sizes()
+
+    def accumulate_sizes(self):
+        """ size including all contents for every object, objects are
+            added to their parents one depth level at a time (deepest first)
+        """
+        total = self.size.copy()
+        order = np.argsort(self.depth, kind='stable')
+        bounds = np.searchsorted(self.depth[order], np.arange(self.depth.max() + 2))
+        for d in range(self.depth.max(), 0, -1):
+            level = order[bounds[d]:bounds[d+1]]
+            np.add.at(total, self.parent[level], total[level])
+        return total
+
+    @property
+    def dir_sizes(self):
+        return self.treesize[self.is_dir]
+
+    def name(self, i):
+        return self.names[self.name_id[i]]
+
 
 class Day07():
+    small_dir = 100000
+
     def __init__(self, data):
-        cmds = TerminalParser.parse_data(data)
+        """ data is an AocData object or an iterator of (cmd, stdout)
+            pairs, e.g. TerminalParser.iter_file
+        """
+        if isinstance(data, AocData):
+            cmds = TerminalParser.iter_data(data)
+        else:
+            cmds = iter(data)
 
-        assert cmds.pop(0)[0] == 'cd /'
+        assert next(cmds)[0] == 'cd /'
         self.root = FsObject('_root', is_dir=True)
+        self.cur_path = [self.root]
+
+        self.dir_sizes = [] # sorted sizes of all directories
+        self.small_total = 0 # sum of the sizes <= small_dir
+        self.counted = {} # directory -> its size in dir_sizes
+        self.pending = {self.root} # directories to (re)count
+        self.dropped = set() # directories removed from the tree
+        self.apply(cmds)
 
-        cur_path = [self.root]
+    def apply(self, cmds):
+        """
+        applies a batch of (cmd, stdout) pairs to the existing tree, the
+        current directory is kept between batches.
+
+        ls replaces the listing of the current directory, subdirectories
+        that are listed again keep their contents. If the size of the
+        directory was known, the change in size is added to its ancestors,
+        otherwise (the first listing) the sizes are computed once in
+        post-order at the end of the batch. The sorted dir_sizes and the
+        sum for solve1 are then updated for the changed directories only.
+        """
         for (cmd, stdout) in cmds:
             if cmd == 'ls':
-                cur_path[-1].contains = [FsObject.from_str(s) for s in stdout]
+                self.list_dir(stdout)
+            elif cmd == 'cd /':
+                self.cur_path = [self.root]
             elif cmd == 'cd ..':
-                cur_path.pop()
+                self.cur_path.pop()
             elif cmd.startswith('cd'):
                 new_dir = cmd[3:]
-                assert new_dir != '..'
-                cur_path.append(cur_path[-1].get_by_name(new_dir))
+                self.cur_path.append(self.cur_path[-1].get_by_name(new_dir))
             else:
                 raise AssertionError("cmd not known or expected")
 
-        self.dir_sizes = [d.treesize for d in FsObject.all_objects if d.is_dir]
+        self.root.treesize # recomputes the invalidated sizes
+        self.recount()
+
+    def list_dir(self, stdout):
+        cur = self.cur_path[-1]
+        old_size = cur._treesize
+        contents = []
+        for s in stdout:
+            known = cur.get_by_name(s[4:]) if s.startswith('dir ') else None
+            if known is not None and known.is_dir:
+                contents.append(known)
+            else:
+                obj = FsObject.from_str(s)
+                if obj.is_dir:
+                    self.pending.add(obj)
+                    if old_size is not None:
+                        obj._treesize = obj.size # nothing listed yet
+                contents.append(obj)
+
+        kept = set(contents)
+        for obj in cur.contains:
+            if obj.is_dir and obj not in kept:
+                for d in obj.walk():
+                    if d.is_dir:
+                        self.pending.discard(d)
+                        self.dropped.add(d)
+        cur.set_contents(contents)
+        self.pending.add(cur)
+
+        if old_size is None:
+            # cur is new in this batch, its size and the sizes of its
+            # ancestors are computed once in post-order at the end
+            for d in reversed(self.cur_path[:-1]):
+                if d._treesize is None:
+                    break
+                d._treesize = None
+                self.pending.add(d)
+            return
+
+        # sizes are known, only the change is passed on to the ancestors
+        new_size = cur.size + sum(x.treesize for x in contents)
+        cur._treesize = new_size
+        for d in reversed(self.cur_path[:-1]):
+            if d._treesize is None:
+                break
+            d._treesize += new_size - old_size
+            self.pending.add(d)
+
+    def recount(self):
+        """ updates dir_sizes and small_total for the pending and dropped
+            directories, large batches rebuild the sorted list instead
+        """
+        stale = [self.counted.pop(d) for d in self.pending | self.dropped if d in self.counted]
+        fresh = []
+        for d in self.pending:
+            self.counted[d] = d.treesize
+            fresh.append(d.treesize)
+        self.pending = set()
+        self.dropped = set()
+
+        if len(stale) + len(fresh) > len(self.dir_sizes) // 16:
+            self.dir_sizes = sorted(self.counted.values())
+            self.small_total = sum(s for s in self.dir_sizes if s <= Day07.small_dir)
+            return
+
+        for s in stale:
+            del self.dir_sizes[bisect_left(self.dir_sizes, s)]
+        for s in fresh:
+            insort(self.dir_sizes, s)
+        self.small_total += sum(s for s in fresh if s <= Day07.small_dir)
+        self.small_total -= sum(s for s in stale if s <= Day07.small_dir)
 
     def solve1(self):
-        return sum(s for s in self.dir_sizes if s <= 100000)
+        return self.small_total
 
     def solve2(self):
         total_space = 70000000
@@ -63,7 +280,30 @@ class Day07():
         required_space = 30000000
 
         free_space_needed = required_space - (total_space - used_space)
-        return min(s for s in self.dir_sizes if s >= free_space_needed)
+        return self.dir_sizes[bisect_left(self.dir_sizes, free_space_needed)]
+
+class Day07Flat():
+    """ same as Day07, using the array based FlatFs """
+
+    def __init__(self, data):
+        if isinstance(data, AocData):
+            cmds = TerminalParser.iter_data(data)
+        else:
+            cmds = iter(data)
+
+        self.fs = FlatFs.from_cmds(cmds)
+        self.dir_sizes = self.fs.dir_sizes
+
+    def solve1(self):
+        return int(self.dir_sizes[self.dir_sizes <= 100000].sum())
+
+    def solve2(self):
+        total_space = 70000000
+        used_space = self.fs.treesize[0]
+        required_space = 30000000
+
+        free_space_needed = required_space - (total_space - used_space)
+        return int(self.dir_sizes[self.dir_sizes >= free_space_needed].min())
 
 sample = """$ cd /
 $ ls
@@ -100,6 +340,76 @@ class Test07():
         p = Day07(data)
         assert p.solve2() == 24933642
 
+    def test_stream(self, tmp_path):
+        f = tmp_path / "07"
+        f.write_text(sample)
+        p = Day07(TerminalParser.iter_file(f))
+        assert p.solve1() == 95437
+        assert p.solve2() == 24933642
+
+    def test_flat(self):
+        from helpers.generators import day07
+
+        for s in [sample, day07(300, seed=2)]:
+            data = AocData.from_str(s)
+            p, q = Day07(data), Day07Flat(data)
+            assert q.solve1() == p.solve1()
+            assert q.solve2() == p.solve2()
+            assert sorted(q.dir_sizes) == sorted(p.dir_sizes)
+
+        # listing a directory again does not add its contents twice
+        relisted = sample.replace("$ cd d\n", "$ cd /\n$ ls\ndir a\n14848514 b.txt\n8504156 c.dat\ndir d\n$ cd d\n")
+        q = Day07Flat(AocData.from_str(relisted))
+        assert len(q.fs.parent) == 14
+        assert q.solve1() == 95437
+
+    def test_apply(self, monkeypatch):
+        def check(p):
+            sizes = sorted(d.treesize for d in p.root.walk() if d.is_dir)
+            assert p.dir_sizes == sizes
+            assert p.small_total == sum(s for s in sizes if s <= 100000)
+
+        cmds = list(TerminalParser.iter_data(AocData.from_str(sample)))
+        p = Day07(cmds[:6]) # up to the listing of e
+        assert p.root.treesize == 14848514 + 8504156 + 29116 + 2557 + 62596 + 584
+        check(p)
+
+        p.apply(cmds[6:])
+        assert p.solve1() == 95437
+        assert p.solve2() == 24933642
+        check(p)
+
+        # count the objects visited by walks and size computations
+        visited = []
+        walk = FsObject.walk
+        monkeypatch.setattr(FsObject, 'walk', lambda self: (visited.append(x) or x for x in walk(self)))
+        d = p.root.get_by_name('d')
+
+        # e is listed again with a new file, d keeps its contents
+        p.apply([('cd /', []), ('cd a', []), ('cd e', []), ('ls', ['584 i', '1000 x'])])
+        assert visited == []
+        assert d._treesize == 24933642 # untouched, still cached
+        assert p.root.treesize == 48381165 + 1000
+        assert p.solve1() == 95437 + 2 * 1000 # e and a
+        check(p)
+
+        # / is listed again without d, its subtree is dropped
+        visited.clear()
+        p.apply([('cd /', []), ('ls', ['dir a', '14848514 b.txt', '8504156 c.dat'])])
+        assert len(visited) == 5 and set(visited) == {d, *d.contains}
+        assert p.root.treesize == 48381165 + 1000 - 24933642
+        assert len(p.dir_sizes) == 3
+        check(p)
+
+    def test_deep(self):
+        depth = 5000
+        log = ["$ cd /"]
+        for i in range(depth):
+            log += ["$ ls", "dir a", "1 f", "$ cd a"]
+        p = Day07(AocData(log))
+        assert p.root.treesize == depth
+        assert p.solve1() == sum(range(1, depth+1))
+
 if __name__ == "__main__":
     f = os.path.join('data/07')
     data = AocData.from_file(f)
@@ -1,4 +1,5 @@
 import os
+from concurrent.futures import ThreadPoolExecutor
 
 import numpy as np
 
@@ -28,9 +29,112 @@ def find_view_score(A, rotation=0):
     return np.rot90(view_scores, k=-rotation).copy()
 
 
+def view_distance(A):
+    """
+    viewing distance of every tree looking towards row 0, O(n^2)
+
+    rows are processed one at a time for all columns at once. blocker[h]
+    holds (per column) the last row with a tree of height >= h, so the
+    view of a tree of height h ends at blocker[h] (or the edge at row 0)
+    """
+    n_heights = int(A.max()) + 1 if A.size else 1
+    blocker = np.zeros((n_heights, A.shape[1]), dtype=np.int64)
+    heights = np.arange(n_heights)[:, None]
+    cols = np.arange(A.shape[1])
+    distance = np.empty(A.shape, dtype=np.int64)
+
+    for i, row in enumerate(A):
+        distance[i] = i - blocker[row, cols]
+        blocker[heights <= row] = i
+
+    return distance
+
+
+def scenic_scores(A):
+    """ product of the viewing distances in all four directions """
+    scores = view_distance(A)
+    scores *= view_distance(A[::-1])[::-1]
+    scores *= view_distance(A.T).T
+    scores *= view_distance(A.T[::-1])[::-1].T
+    return scores
+
+
+def open_forest(f_in):
+    """
+    maps the input file as a read-only (rows, cols) uint8 array without
+    reading it. The values are the ascii codes of the digits, the offset
+    of ord('0') does not change any height comparison.
+    """
+    with open(f_in, 'rb') as f:
+        cols = len(f.readline().rstrip(b'\n'))
+    flat = np.memmap(f_in, dtype=np.uint8, mode='r')
+    rows = (len(flat) + 1) // (cols + 1) # trailing newline is optional
+    return np.lib.stride_tricks.as_strided(flat, shape=(rows, cols), strides=(cols + 1, 1), writeable=False)
+
+
+def _visible_from_top(T, carry):
+    """ trees of T visible from above, carry holds the highest tree
+        above T for every column (-1 at the edge)
+    """
+    M = np.maximum.accumulate(np.vstack([carry[None, :], T]), axis=0)
+    return T > M[:-1]
+
+
+def _count_visible_tile(tile, above, below):
+    T = tile.astype(np.int16)
+    edge = np.full(T.shape[0], -1, dtype=np.int16)
+
+    visible = _visible_from_top(T, above)
+    visible |= _visible_from_top(T[::-1], below)[::-1]
+    visible |= _visible_from_top(T.T, edge).T
+    visible |= _visible_from_top(T.T[::-1], edge)[::-1].T
+    return int(visible.sum())
+
+
+def count_visible_tiled(H, tile_rows=1024, workers=None):
+    """
+    number of visible trees of the height grid H (e.g. from open_forest),
+    processed in tiles of tile_rows full rows so only one tile per worker
+    is in memory at a time.
+
+    A first pass computes the column maxima of every tile, the running
+    maxima above and below each tile are carried into the second pass as
+    boundary state. Tiles are independent then and run on a thread pool
+    if workers is given.
+    """
+    rows, cols = H.shape
+    bounds = list(range(0, rows, tile_rows)) + [rows]
+    tiles = list(zip(bounds, bounds[1:]))
+
+    pool = ThreadPoolExecutor(workers) if workers else None
+    _map = pool.map if pool else map
+    try:
+        tile_max = list(_map(lambda t: H[t[0]:t[1]].max(axis=0).astype(np.int16), tiles))
+
+        edge = np.full(cols, -1, dtype=np.int16)
+        above = [edge]
+        for m in tile_max[:-1]:
+            above.append(np.maximum(above[-1], m))
+        below = [edge]
+        for m in tile_max[:0:-1]:
+            below.append(np.maximum(below[-1], m))
+        below = below[::-1]
+
+        counts = _map(lambda i: _count_visible_tile(H[slice(*tiles[i])], above[i], below[i]), range(len(tiles)))
+        return sum(counts)
+    finally:
+        if pool:
+            pool.shutdown()
+
+
 class Day08():
-    def __init__(self, data):
-        self.A = np.array([list(map(int, s)) for s in data.data])
+    parser_version = 1
+
+    def parse(data):
+        return np.array([list(map(int, s)) for s in data.data])
+
+    def __init__(self, data, parsed=None):
+        self.A = Day08.parse(data) if parsed is None else parsed
 
     def solve1(self):
         V = np.zeros_like(self.A, dtype=bool)
@@ -40,8 +144,7 @@ class Day08():
         return V.sum()
 
     def solve2(self):
-        scenic_scores = np.prod([find_view_score(self.A, rot) for rot in range(4)], axis=0)
-        return scenic_scores.max()
+        return scenic_scores(self.A).max()
 
 sample = """30373
 25512
@@ -60,6 +163,28 @@ class Test08():
         p = Day08(data)
         assert p.solve2() == 8
 
+    def test_tiled(self, tmp_path):
+        from helpers.generators import day08
+
+        f = tmp_path / "08"
+        for n, tile_rows in [(5, 2), (23, 4), (30, 64)]:
+            s = day08(n, seed=n)
+            f.write_text(s + "\n")
+            expected = Day08(AocData.from_str(s)).solve1()
+            assert count_visible_tiled(open_forest(f), tile_rows) == expected
+            assert count_visible_tiled(open_forest(f), tile_rows, workers=2) == expected
+
+        f.write_text(sample) # without trailing newline
+        assert count_visible_tiled(open_forest(f), 2) == 21
+
+    def test_scenic_scores(self):
+        from helpers.generators import day08
+
+        for n in (1, 2, 13):
+            A = Day08(AocData.from_str(day08(n, seed=n))).A
+            expected = np.prod([find_view_score(A, rot) for rot in range(4)], axis=0)
+            assert (scenic_scores(A) == expected).all()
+
 if __name__ == "__main__":
     f = os.path.join('data/08')
     data = AocData.from_file(f)
@@ -1,8 +1,11 @@
 import os
+from array import array
+from bisect import bisect_left, bisect_right
 
 import numpy as np
 
 from helpers.inputs import AocData, DataParser
+from helpers.types import IntervalSet
 
 class Rope():
 
@@ -56,6 +59,113 @@ class Rope():
         for cmd in cmds:
             self.move_head(*cmd)
 
+def _line_intervals(a, b0, b1):
+    """
+    merges cells (a, b) with b0 <= b <= b1 on lines a into an
+    IntervalSet. Cells are encoded as a * width + b with a width larger
+    than the range of b, so intervals on different lines never touch.
+    returns the set and a function decoding it to (a, b0, b1) arrays
+    """
+    a_min, b_min = a.min(), min(b0.min(), b1.min())
+    width = max(b0.max(), b1.max()) - b_min + 2
+    S = IntervalSet.from_arrays((a-a_min)*width + b0-b_min, (a-a_min)*width + b1-b_min)
+
+    def decode(S):
+        return S.starts // width + a_min, S.starts % width + b_min, S.ends % width + b_min
+    return S, decode
+
+
+def _count_crossings(horizontal, vertical):
+    """
+    number of cells covered by a horizontal and a vertical interval,
+    intervals are given as (line, lo, hi) arrays and must be disjoint
+    within a line. Sweeps along x with a Fenwick tree over the rows of
+    the active horizontal intervals, O((h + v) log(h)).
+    """
+    ys, x0, x1 = (a.tolist() for a in horizontal)
+    rows = sorted(set(ys))
+    tree = [0] * (len(rows) + 1)
+
+    def update(y, delta):
+        i = bisect_left(rows, y) + 1
+        while i < len(tree):
+            tree[i] += delta
+            i += i & -i
+
+    def prefix(i):
+        total = 0
+        while i > 0:
+            total += tree[i]
+            i -= i & -i
+        return total
+
+    # (x, kind, ...) with kind 0 = add/remove before 1 = query at the same x
+    events = [(lo, 0, y, 1) for y, lo in zip(ys, x0)]
+    events += [(hi+1, 0, y, -1) for y, hi in zip(ys, x1)]
+    events += [(x, 1, lo, hi) for x, lo, hi in zip(*(a.tolist() for a in vertical))]
+    events.sort()
+
+    crossings = 0
+    for x, kind, a, b in events:
+        if kind == 0:
+            update(a, b)
+        else:
+            crossings += prefix(bisect_right(rows, b)) - prefix(bisect_left(rows, a))
+    return crossings
+
+
+class SegmentRope():
+    """
+    Two knot rope recording the trail of the tail as straight segments
+    instead of single positions, a move costs O(1) independent of its
+    count. Same results as Rope.
+    """
+
+    dirs = {
+        'U': (1, 0),
+        'D': (-1, 0),
+        'R': (0, 1),
+        'L': (0, -1),
+    }
+
+    def __init__(self):
+        self.head = (0, 0)
+        self.tail = (0, 0)
+        self.segments = [(0, 0, 0, 0)] # (start, end) of the tail, ends inclusive
+
+    def move_head(self, _dir, count):
+        dx, dy = self.dirs[_dir]
+        hx, hy = self.head[0] + dx*int(count), self.head[1] + dy*int(count)
+        tx, ty = self.tail
+        dist = max(abs(hx-tx), abs(hy-ty))
+        if dist > 1:
+            # the tail first steps in line with the head, then follows it
+            ux, uy = int((hx-tx) / dist), int((hy-ty) / dist)
+            start = (hx - (dist-1)*ux, hy - (dist-1)*uy)
+            self.tail = (hx - ux, hy - uy)
+            self.segments.append(start + self.tail)
+        self.head = (hx, hy)
+
+    def move_multiple(self, cmds):
+        for cmd in cmds:
+            self.move_head(*cmd)
+
+    @property
+    def covered(self):
+        """ number of cells visited by the tail, union of all segments """
+        x0, y0, x1, y1 = np.array(self.segments, dtype=np.int64).T
+        is_h = x0 == x1 # includes single cells
+        is_v = ~is_h
+
+        H, decode_h = _line_intervals(x0[is_h], np.minimum(y0, y1)[is_h], np.maximum(y0, y1)[is_h])
+        if not is_v.any():
+            return H.size
+        V, decode_v = _line_intervals(y0[is_v], np.minimum(x0, x1)[is_v], np.maximum(x0, x1)[is_v])
+
+        # horizontal intervals are (x, y0, y1), vertical ones (y, x0, x1)
+        return H.size + V.size - _count_crossings(decode_h(H), decode_v(V))
+
+
 class MultiRope():
     def __init__(self, n):
         self.ropes = [Rope()]
@@ -75,20 +185,65 @@ class MultiRope():
         self.head_rope.move_multiple(cmds)
 
 
+class KnotChain():
+    """
+    Rope of n knots with all positions in one flat array (x0, y0, x1,
+    y1, ...). Every step of the head walks down the chain and stops at
+    the first knot that does not move, the knots behind it cannot move
+    either. Visited positions of every knot are recorded in the same
+    simulation.
+    """
+
+    def __init__(self, n):
+        self.n = n
+        self.pos = array('q', [0] * (2*n))
+        self.visited = [{0} for i in range(n)] # positions encoded as (x << 32) + y
+
+    def move_head(self, _dir, count):
+        dx, dy = SegmentRope.dirs[_dir]
+        pos = self.pos
+        visited = self.visited
+        end = 2 * self.n
+        for step in range(int(count)):
+            pos[0] += dx
+            pos[1] += dy
+            visited[0].add((pos[0] << 32) + pos[1])
+            for i in range(2, end, 2):
+                ddx = pos[i-2] - pos[i]
+                ddy = pos[i-1] - pos[i+1]
+                if -1 <= ddx <= 1 and -1 <= ddy <= 1:
+                    break
+                pos[i] += (ddx > 0) - (ddx < 0)
+                pos[i+1] += (ddy > 0) - (ddy < 0)
+                visited[i >> 1].add((pos[i] << 32) + pos[i+1])
+
+    def move_multiple(self, cmds):
+        for cmd in cmds:
+            self.move_head(*cmd)
+
+    def covered(self, i=-1):
+        """ number of positions visited by knot i (default: the tail) """
+        return len(self.visited[i])
+
+    @property
+    def all_covered(self):
+        return [len(v) for v in self.visited]
+
+
 class Day09():
     def __init__(self, data):
         p = DataParser(str, int, sep=' ')
         self.cmds = p.parse_data(data)
 
     def solve1(self):
-        R = Rope()
+        R = SegmentRope()
         R.move_multiple(self.cmds)
         return R.covered
 
     def solve2(self):
-        M = MultiRope(9)
-        M.move_multiple(self.cmds)
-        return M.tail_rope.covered
+        K = KnotChain(10)
+        K.move_multiple(self.cmds)
+        return K.covered()
 
 sample1 = """R 4
 U 4
@@ -119,6 +274,26 @@ class Test09():
         p = Day09(data)
         assert p.solve2() == 1
 
+    def test_segments(self):
+        from helpers.generators import day09
+
+        for seed in range(5):
+            cmds = DataParser(str, int, sep=' ').parse_data(AocData.from_str(day09(200, seed=seed)))
+            R, S = Rope(), SegmentRope()
+            R.move_multiple(cmds)
+            S.move_multiple(cmds)
+            assert S.covered == R.covered
+            assert S.tail == tuple(int(i) for i in R.tail)
+
+    def test_chain(self):
+        from helpers.generators import day09
+
+        cmds = DataParser(str, int, sep=' ').parse_data(AocData.from_str(day09(100, seed=1)))
+        M, K = MultiRope(9), KnotChain(10)
+        M.move_multiple(cmds)
+        K.move_multiple(cmds)
+        assert K.all_covered[1:] == [r.covered for r in M.ropes]
+
     def test_3(self):
         data = AocData.from_str(sample2)
         p = Day09(data)
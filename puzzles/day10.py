@@ -1,4 +1,8 @@
 import os
+from array import array
+from bisect import bisect_right
+
+import numpy as np
 
 from helpers.inputs import AocData
 
@@ -31,33 +35,128 @@ class CPU():
     def signal_strength(self, i):
         return i * self.history[i-1]
 
-    def render_output(self):
-        output = ""
-        for i,s in enumerate(self.history):
-            px = i % 40
-            if len(output) and (px % 40 == 0):
-                output += '\n'
+    def register_array(self):
+        """ register value per cycle as numpy array """
+        return np.array(self.history, dtype=np.int64)
 
-            if abs(s - px) <= 1:
-                output += '#'
-            else:
-                output += '.'
+    def render_output(self, width=40):
+        return CRT(width).to_text(self.register_array())
 
-        return output
 
 
+class CompactCPU(CPU):
+    """
+    Same as CPU, but the history only stores the cycles at which the
+    register changes (run-length encoded). Queries for a cycle use
+    binary search, O(log(changes)).
+    """
+
+    def from_file(f_in, init_state=1):
+        """ runs the program in f_in line by line without storing it """
+        c = CompactCPU(init_state)
+        with open(f_in, 'r') as f:
+            c.run(f)
+        return c
+
+    def __init__(self, init_state = 1):
+        self.state = init_state
+        self.cycle = 0
+        self.change_cycles = array('q', [1]) # first cycle with the new value
+        self.values = array('q', [init_state])
+
+    def step(self, n=1):
+        self.cycle += n
+
+    def addx(self, x):
+        self.step(2)
+        if x:
+            self.state += int(x)
+            self.change_cycles.append(self.cycle + 1)
+            self.values.append(self.state)
+
+    def run(self, lines):
+        for cmd in lines:
+            self.parse_cmd(cmd)
+
+    def register_at(self, i):
+        """ value of the register during cycle i (1-based) """
+        if not 1 <= i <= self.cycle:
+            raise IndexError('cycle out of range')
+        return self.values[bisect_right(self.change_cycles, i) - 1]
+
+    def signal_strength(self, i):
+        return i * self.register_at(i)
+
+    def register_array(self):
+        runs = np.diff(np.append(self.change_cycles, self.cycle + 1))
+        return np.repeat(np.array(self.values, dtype=np.int64), runs)
+
+    @property
+    def history(self):
+        """ register value per cycle as a list (expands the history) """
+        bounds = list(self.change_cycles[1:]) + [self.cycle + 1]
+        history = []
+        for start, end, value in zip(self.change_cycles, bounds, self.values):
+            history += [value] * (min(end, self.cycle + 1) - start)
+        return history
+
+
+class CRT():
+    """
+    Renders register values (one per cycle) at once: pixel i is lit if
+    the sprite (register +-1) covers column i % width.
+    """
+
+    def __init__(self, width=40, height=6):
+        self.width = width
+        self.height = height
+
+    def pixels(self, registers):
+        """ lit pixels for all cycles as flat bool array """
+        registers = np.asarray(registers)
+        columns = np.arange(len(registers)) % self.width
+        return np.abs(registers - columns) <= 1
+
+    def frames(self, registers):
+        """ lit pixels as (frames, height, width) bool array, the last
+            frame is padded with dark pixels
+        """
+        lit = self.pixels(registers)
+        frame_size = self.width * self.height
+        n_frames = -(-len(lit) // frame_size)
+        buf = np.zeros(n_frames * frame_size, dtype=bool)
+        buf[:len(lit)] = lit
+        return buf.reshape(n_frames, self.height, self.width)
+
+    def to_bytes(self, registers):
+        """ rows of '#' and '.' separated by newlines, the last row is
+            not padded (same layout as the original render_output)
+        """
+        lit = self.pixels(registers)
+        n = len(lit)
+        if n == 0:
+            return b''
+        rows = -(-n // self.width)
+        grid = np.full(rows * self.width, ord('.'), dtype=np.uint8)
+        grid[:n][lit] = ord('#')
+        buf = np.full((rows, self.width + 1), ord('\n'), dtype=np.uint8)
+        buf[:, :self.width] = grid.reshape(rows, self.width)
+        return buf.tobytes()[:n + rows - 1]
+
+    def to_text(self, registers):
+        return self.to_bytes(registers).decode()
+
 
 class Day10():
     def __init__(self, data):
-        self.c = CPU()
-        for cmd in data.data:
-            self.c.parse_cmd(cmd)
+        self.c = CompactCPU()
+        self.c.run(data.data)
 
     def solve1(self):
         return sum(self.c.signal_strength(i) for i in range(20,240,40))
 
     def solve2(self):
-        return self.c.render_output()
+        return CRT(40).to_text(self.c.register_array())
 
 sample = """noop
 addx 3
@@ -70,6 +169,47 @@ class Test10():
         assert p.c.history == [1,1,1,4,4]
         assert p.c.state == -1
 
+    def test_compact(self, tmp_path):
+        from helpers.generators import day10
+
+        s = day10(300, seed=1)
+        ref = CPU()
+        for cmd in s.split('\n'):
+            ref.parse_cmd(cmd)
+
+        f = tmp_path / "10"
+        f.write_text(s + "\n")
+        c = CompactCPU.from_file(f)
+        assert c.history == ref.history
+        assert all(c.register_at(i) == ref.history[i-1] for i in range(1, c.cycle+1))
+        assert c.signal_strength(220) == ref.signal_strength(220)
+        assert c.render_output() == ref.render_output()
+        assert (c.register_array() == np.array(ref.history)).all()
+
+    def test_crt(self):
+        from helpers.generators import day10
+
+        c = CompactCPU()
+        c.run(day10(300, seed=2).split('\n'))
+
+        # reference: pixel by pixel
+        output = ""
+        for i,s in enumerate(c.history):
+            px = i % 40
+            if len(output) and (px % 40 == 0):
+                output += '\n'
+            output += '#' if abs(s - px) <= 1 else '.'
+
+        crt = CRT(40, 6)
+        assert crt.to_text(c.register_array()) == output
+        assert c.render_output() == output
+
+        frames = crt.frames(c.register_array())
+        assert frames.shape == (-(-c.cycle // 240), 6, 40)
+        assert frames.sum() == output.count('#')
+        assert CRT(7).to_text([0, 1, 5]) == '##.'
+        assert CRT(2).to_bytes([0, 0, 5]) == b'##\n.'
+
     def test_2(self):
         data = AocData.from_file('./data/10.sample')
         p = Day10(data)
@@ -6,25 +6,30 @@ from helpers.inputs import AocData
 
 class HeightMap():
 
-    def __init__(self, data):
-        self.map = None
-        self.start = None
-        self.end = None
+    def parse(data):
+        """ returns the height map, start and end position """
+        start = None
+        end = None
 
         grid=[]
         for i,line in enumerate(data.data):
             row = []
             for j,c in enumerate(line):
                 if c == 'S':
-                    self.start = (i,j)
+                    start = (i,j)
                     c = 'a'
                 elif c == 'E':
-                    self.end = (i,j)
+                    end = (i,j)
                     c = 'z'
                 row.append(ord(c)-ord('a'))
             grid.append(row)
 
-        self.map = np.array(grid)
+        return np.array(grid), start, end
+
+    def __init__(self, data, parsed=None):
+        if parsed is None:
+            parsed = HeightMap.parse(data)
+        self.map, self.start, self.end = parsed
 
     def can_move_in_dir(self, orientation):
         return np.diff(np.rot90(self.map, k=orientation), append=99)<=1
@@ -69,8 +74,13 @@ class HeightMap():
             raise RuntimeError('Maximum iterations reached')
 
 class Day12():
-    def __init__(self, data):
-        self.M = HeightMap(data)
+    parser_version = 1
+
+    def parse(data):
+        return HeightMap.parse(data)
+
+    def __init__(self, data, parsed=None):
+        self.M = HeightMap(data, parsed)
 
     def solve1(self):
         return self.M.find_route_up()
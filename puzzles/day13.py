@@ -28,15 +28,19 @@ def compare_items(a,b):
 
 
 class Day13():
-    def __init__(self, data):
-        self.data = data
+    parser_version = 1
+
+    def parse(data):
+        return [tuple(eval(s) for s in g.data) for g in data.split_groups()]
+
+    def __init__(self, data, parsed=None):
+        self.pairs = Day13.parse(data) if parsed is None else parsed
 
     def solve1(self):
-        pairs = [tuple(eval(s) for s in g.data) for g in self.data.split_groups()]
-        return sum(i+1 for i,p in enumerate(pairs) if compare_items(*p) < 0)
+        return sum(i+1 for i,p in enumerate(self.pairs) if compare_items(*p) < 0)
 
     def solve2(self):
-        packets = [eval(s) for s in self.data.data if s != '']
+        packets = [p for pair in self.pairs for p in pair]
         packets += [ [[2]], [[6]] ] # additional packets
         packets.sort(key=cmp_to_key(compare_items))
         return (packets.index([[2]])+1)*(packets.index([[6]])+1)
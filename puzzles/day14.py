@@ -12,7 +12,7 @@ def draw_line(start, end):
 
 class Cave():
 
-    def from_data(data):
+    def parse_rocks(data):
         rocks = set()
         p = DataParser(int,int,sep=',')
         for line in data.data:
@@ -20,7 +20,10 @@ class Cave():
             for s,e in zip(points, points[1:]):
                 rocks |= set(draw_line(s,e))
 
-        return Cave(rocks)
+        return rocks
+
+    def from_data(data):
+        return Cave(Cave.parse_rocks(data))
 
     def __init__(self, rocks):
         self.rocks = rocks
@@ -71,8 +74,13 @@ class Cave():
 
 
 class Day14():
-    def __init__(self, data):
-        self.cave = Cave.from_data(data)
+    parser_version = 1
+
+    def parse(data):
+        return Cave.parse_rocks(data)
+
+    def __init__(self, data, parsed=None):
+        self.cave = Cave.from_data(data) if parsed is None else Cave(parsed)
 
     def solve1(self):
         return self.cave.fill_no_floor()
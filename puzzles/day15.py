@@ -2,8 +2,8 @@ import os
 import re
 from itertools import combinations
 
-from helpers.inputs import AocData
-from helpers.types import MyRange
+from helpers.inputs import AocData, RegexParser
+from helpers.types import MyRange, IntervalSet
 
 
 def distance(a,b):
@@ -41,6 +41,11 @@ class Sensor():
         xs, ys, xb, yb = (int(i) for i in m)
         return Sensor((xs,ys), (xb, yb))
 
+    def from_data(data):
+        """ parses all lines with a single pass of the regex """
+        p = RegexParser(Sensor.p.pattern, int, int, int, int)
+        return [Sensor((xs,ys), (xb, yb)) for xs, ys, xb, yb in p.parse_data(data)]
+
     def __init__(self, pos, beacon):
         self.pos = pos
         self.beacon = beacon
@@ -73,37 +78,13 @@ class Sensor():
                 yield BoundaryLine(d, x+d*y)
 
 
-
-def merge_ranges(ranges):
-    """ Takes a list of MyRange objects and computes the union
-        of all ranges.
-        The union may consist of multiple ranges and is henceforth
-        returned as a list of MyRange objects
-    """
-    out = []
-    cur_range = ranges[0]
-    for next_range in ranges[1:]:
-        try:
-            cur_range = cur_range.union(next_range, check_valid=True)
-        except AssertionError:
-            out.append(cur_range)
-            cur_range=next_range
-    else:
-        out.append(cur_range)
-
-    return out
-
-
 class Day15():
     def __init__(self, data):
-        self.sensors = [Sensor.from_str(l) for l in data.data]
+        self.sensors = Sensor.from_data(data)
 
     def find_covered(self, x, axis):
         ranges = [s.get_range_at_pos(x, axis=axis) for s in self.sensors] # get ranges
-        ranges = [r for r in ranges if r.is_valid] # keep only the valid ones
-        ranges.sort(key=lambda r: r.start) # sort by starting point
-
-        covered = sum(r.size for r in merge_ranges(ranges)) # compute union
+        covered = IntervalSet.from_ranges(ranges).size # union, invalid ranges are dropped
         occupied = len([b for b in beacons if b[axis]==x]) # number of cells with a beacon in it
 
         return covered-occupied
@@ -0,0 +1,106 @@
+"""
+Registry of all puzzles and a runner executing them on a process pool.
+
+Every part runs in a fresh worker process since several puzzles keep
+state on module level (e.g. the beacons set of day15) that
+would otherwise leak between runs.
+"""
+import os
+import json
+import time
+import importlib
+from concurrent.futures import ProcessPoolExecutor
+
+from helpers.cache import ParseCache
+from helpers.inputs import AocData
+from helpers.profiling import Profiler, NULL_PROFILER
+
+# day -> (module, class, {part: method})
+PUZZLES = {
+    '04': ('puzzles.day04', 'Day04', {1: 'solve1', 2: 'solve2'}),
+    '05': ('puzzles.day05', 'Day05', {1: 'solve1', 2: 'solve2'}),
+    '06': ('puzzles.day06', 'Day06', {1: 'solve1', 2: 'solve2'}),
+    '07': ('puzzles.day07', 'Day07', {1: 'solve1', 2: 'solve2'}),
+    '08': ('puzzles.day08', 'Day08', {1: 'solve1', 2: 'solve2'}),
+    '09': ('puzzles.day09', 'Day09', {1: 'solve1', 2: 'solve2'}),
+    '10': ('puzzles.day10', 'Day10', {1: 'solve1', 2: 'solve2'}),
+    '11': ('puzzles.day11v2', 'Day11', {1: 'solve1', 2: 'solve2'}),
+    '12': ('puzzles.day12', 'Day12', {1: 'solve1', 2: 'solve2'}),
+    '13': ('puzzles.day13', 'Day13', {1: 'solve1', 2: 'solve2'}),
+    '14': ('puzzles.day14', 'Day14', {1: 'solve1', 2: 'solve2'}),
+    '15': ('puzzles.day15', 'Day15', {1: 'solve1', 2: 'solve2_2'}),
+    '17': ('puzzles.day17', 'Day17', {1: 'solve1', 2: 'solve2'}),
+    '21': ('puzzles.day21', 'Day21', {1: 'solve1', 2: 'solve2'}),
+}
+
+
+def get_puzzle(day):
+    """ returns the DayNN class registered for day """
+    module, name, _ = PUZZLES[day]
+    return getattr(importlib.import_module(module), name)
+
+
+def run_part(day, part, data_dir='data', cache_dir=None, profile=False):
+    """ solves a single part, timing parsing and solving separately
+
+        with a cache_dir, puzzles providing a parse function reuse the
+        parsed input of earlier runs (see helpers.cache)
+
+        profile = True adds a per-phase report (load, init, solve) with
+        cProfile and tracemalloc results (see helpers.profiling)
+    """
+    cls = get_puzzle(day)
+    method = PUZZLES[day][2][part]
+    f_in = os.path.join(data_dir, day)
+    prof = Profiler(cprofile=True, memory=True) if profile else NULL_PROFILER
+
+    t0 = time.perf_counter()
+    with prof.phase('load'):
+        if cache_dir is not None and hasattr(cls, 'parse'):
+            data = None
+            parsed = ParseCache(cache_dir).load(f_in, cls.parse, f"day{day}", cls.parser_version)
+        else:
+            data = AocData.from_file(f_in)
+            parsed = None
+    with prof.phase('init'):
+        P = cls(data) if parsed is None else cls(data, parsed=parsed)
+    t1 = time.perf_counter()
+    with prof.phase('solve'):
+        result = getattr(P, method)()
+    t2 = time.perf_counter()
+
+    return {
+        'day': day,
+        'part': part,
+        'result': result,
+        'parse_time': t1 - t0,
+        'solve_time': t2 - t1,
+        'phases': prof.report(),
+    }
+
+
+def run_all(days=None, parts=(1, 2), data_dir='data', workers=None, cache_dir=None, profile=False):
+    """ runs all requested (day, part) combinations on a process pool
+        and returns the reports in the order they were requested
+    """
+    days = sorted(PUZZLES) if days is None else days
+    jobs = [(d, p) for d in days for p in parts]
+
+    with ProcessPoolExecutor(max_workers=workers, max_tasks_per_child=1) as pool:
+        futures = [pool.submit(run_part, d, p, data_dir, cache_dir, profile) for d, p in jobs]
+        return [f.result() for f in futures]
+
+
+def format_report(reports):
+    lines = [f"{'day':>3} {'part':>4} {'parse [s]':>10} {'solve [s]':>10}  result"]
+    for r in reports:
+        result = str(r['result']).replace('\n', '\n' + ' '*32)
+        lines.append(f"{r['day']:>3} {r['part']:>4} {r['parse_time']:>10.4f} {r['solve_time']:>10.4f}  {result}")
+    return '\n'.join(lines)
+
+
+def dump_profile(reports, f_out):
+    """ writes the per-phase reports of all parts as json """
+    profile = [{'day': r['day'], 'part': r['part'], 'phases': r['phases']} for r in reports]
+    with open(f_out, 'w') as f:
+        json.dump(profile, f, indent=2)
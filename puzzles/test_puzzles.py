@@ -5,3 +5,64 @@ def test_day04():
     data = AocData.from_str(day04.sample)
     p = day04.Day04(data)
     assert p.solve1() == 2
+
+
+def test_registry(tmp_path):
+    from puzzles.registry import PUZZLES, get_puzzle, run_part, run_all
+
+    assert get_puzzle('04') is day04.Day04
+    assert set(PUZZLES['15'][2]) == {1, 2}
+
+    with open(tmp_path / '04', 'w') as f:
+        f.write(day04.sample)
+
+    r = run_part('04', 1, data_dir=tmp_path)
+    assert r['result'] == 2
+    assert r['parse_time'] >= 0 and r['solve_time'] >= 0
+
+    reports = run_all(['04'], parts=(1, 2), data_dir=tmp_path, workers=2)
+    assert [r['result'] for r in reports] == [2, 4]
+
+
+def test_main(monkeypatch):
+    import pytest
+    import puzzles.__main__ as cli
+
+    calls = []
+    monkeypatch.setattr(cli, 'run_all', lambda days, *args: calls.append(days) or [])
+    cli.main([]) # no days runs everything
+    cli.main(['04', '15'])
+    assert calls == [None, ['04', '15']]
+
+    with pytest.raises(SystemExit):
+        cli.main(['99'])
+
+
+def test_bench():
+    from puzzles.bench import fit_exponent, run_case
+
+    assert abs(fit_exponent([10, 100, 1000], [1, 100, 10000]) - 2) < 1e-6
+
+    r = run_case('04.solve1', levels=2, repeat=2, min_time=0)
+    assert r['sizes'] == [1000, 2000]
+    assert len(r['times']) == len(r['build_times']) == len(r['peaks']) == 2
+
+    r = run_case('04.solve1', levels=2, repeat=1, min_time=0.01)
+    assert r['sizes'][0] > 1000 # grown until a run takes min_time
+
+
+def test_generated_inputs():
+    from helpers import generators
+    from puzzles.registry import PUZZLES, get_puzzle
+
+    sizes = {'08': 20, '10': 240, '11': 3, '12': 20, '15': 5}
+    for day, g in generators.GENERATORS.items():
+        data = AocData.from_str(g(sizes.get(day, 50), seed=3))
+        p = get_puzzle(day)(data)
+        assert getattr(p, PUZZLES[day][2][1])() is not None
+
+    # humn is the solution of part 2
+    s = generators.day21(100, seed=3)
+    humn = [l for l in s.split('\n') if l.startswith('humn: ')][0]
+    p = get_puzzle('21')(AocData.from_str(s))
+    assert p.solve2() == int(humn[6:])